@@ -0,0 +1,176 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from airport.cache import bump_version
+from airport.models import Flight, Route, Ticket
+
+
+def summarize(latencies, query_counts) -> dict:
+    """Latency percentiles in milliseconds and query counts of one scenario"""
+    latencies = sorted(latency * 1000 for latency in latencies)
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        # quantiles needs two samples, a single one is every percentile
+        quantiles = latencies * 99
+    return {
+        "requests": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_median": statistics.median(query_counts),
+        "queries_max": max(query_counts),
+    }
+
+
+class Scenario:
+    """One API call measured repeatedly.
+
+    ``prepare`` runs untimed before every request and returns the request
+    arguments, so picking ids or invalidating caches is not measured. With
+    reconnect the connection is closed before every request, so each one
+    pays for opening a new connection like with CONN_MAX_AGE = 0.
+    """
+
+    method = "get"
+    expected_status = 200
+
+    def __init__(self, name, client, rng, warm_cache=False, reconnect=False):
+        self.name = name
+        self.client = client
+        self.rng = rng
+        self.warm_cache = warm_cache
+        self.reconnect = reconnect
+
+    def prepare(self) -> dict:
+        raise NotImplementedError
+
+    def run(self, iterations, warmup) -> dict:
+        latencies = []
+        query_counts = []
+        for iteration in range(warmup + iterations):
+            kwargs = self.prepare()
+            if self.reconnect:
+                connection.close()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(self.client, self.method)(**kwargs)
+                elapsed = time.perf_counter() - started
+            if response.status_code != self.expected_status:
+                raise RuntimeError(
+                    f"{self.name}: {response.status_code} {response.content[:200]}"
+                )
+            if iteration >= warmup:
+                latencies.append(elapsed)
+                query_counts.append(len(queries))
+        return summarize(latencies, query_counts)
+
+
+class FlightList(Scenario):
+    def prepare(self) -> dict:
+        return {"path": reverse("airport:flight-list")}
+
+
+class FlightDetail(Scenario):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flight_ids = list(Flight.objects.values_list("id", flat=True))
+
+    def prepare(self) -> dict:
+        flight_id = self.rng.choice(self.flight_ids)
+        return {"path": reverse("airport:flight-detail", args=[flight_id])}
+
+
+class RouteList(Scenario):
+    def prepare(self) -> dict:
+        if not self.warm_cache:
+            bump_version(Route)
+        return {"path": reverse("airport:route-list")}
+
+
+class OrderList(Scenario):
+    def prepare(self) -> dict:
+        return {"path": reverse("airport:order-list")}
+
+
+class OrderCreate(Scenario):
+    method = "post"
+    expected_status = 201
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flights = list(Flight.objects.select_related("airplane"))
+
+    def prepare(self) -> dict:
+        # Every flight is tried at most once, full benchmark flights end the run
+        for flight in self.rng.sample(self.flights, len(self.flights)):
+            taken = set(Ticket.objects.filter(flight=flight).values_list("row", "seat"))
+            free = [
+                (row, seat)
+                for row in range(1, flight.airplane.rows + 1)
+                for seat in range(1, flight.airplane.seats_in_row + 1)
+                if (row, seat) not in taken
+            ]
+            if len(free) >= 2:
+                break
+        else:
+            raise CommandError(
+                f"{self.name}: no flight has two free seats left, "
+                "generate more flights or run fewer iterations"
+            )
+        tickets = [
+            {"flight": flight.id, "row": row, "seat": seat}
+            for row, seat in self.rng.sample(free, 2)
+        ]
+        return {
+            "path": reverse("airport:order-list"),
+            "data": {"tickets": tickets},
+            "format": "json",
+        }
+
+
+SCENARIOS = {
+    "flight_list": FlightList,
+    "flight_detail": FlightDetail,
+    "route_list": RouteList,
+    "order_list": OrderList,
+    "order_create": OrderCreate,
+}
+
+
+def run_scenarios(
+    client, names, iterations, warmup, seed=0, warm_cache=False, reconnect=False
+):
+    rng = random.Random(seed)
+    return {
+        name: SCENARIOS[name](name, client, rng, warm_cache, reconnect).run(
+            iterations, warmup
+        )
+        for name in names
+    }
+
+
+def compare(results, baseline, threshold) -> list:
+    """Return (scenario, metric, before, after, change %, regressed) rows.
+
+    Only p50 latency and the median query count are compared, an increase
+    above threshold percent is a regression.
+    """
+    rows = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "queries_median"):
+            old, new = before[metric], result[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append((name, metric, old, new, change, change > threshold))
+    return rows
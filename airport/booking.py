@@ -0,0 +1,114 @@
+import logging
+import random
+import time
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+
+from airport.events import record_order_created
+from airport.exceptions import SeatConflictError
+from airport.models import Flight, Order, Ticket
+from airport.seat_map import invalidate_seat_map
+
+logger = logging.getLogger(__name__)
+
+# Postgres serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = ("40001", "40P01")
+
+
+def find_taken_seats(seats) -> list:
+    """Return the (flight_id, row, seat) triples that are already sold"""
+    return list(
+        Ticket.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(flight_id=flight_id, row=row, seat=seat)
+                    for flight_id, row, seat in seats
+                ),
+            )
+        ).values_list("flight_id", "row", "seat")
+    )
+
+
+def is_retryable(error) -> bool:
+    cause = error.__cause__
+    sqlstate = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+    return sqlstate in RETRYABLE_SQLSTATES
+
+
+def book_seats(order_data, tickets_data) -> Order:
+    """Create the order and its tickets while holding the flights' row locks.
+
+    Locking the flight rows (in id order, to avoid deadlocks) serializes
+    bookings per flight, so the seat check below cannot race with another
+    booking of the same flight.
+    """
+    sold = Counter(ticket_data["flight"].id for ticket_data in tickets_data)
+    list(
+        Flight.objects.select_for_update()
+        .filter(id__in=sold)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    seats = {
+        (ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"])
+        for ticket_data in tickets_data
+    }
+    taken = find_taken_seats(seats)
+    if taken:
+        raise SeatConflictError(taken)
+
+    order = Order.objects.create(**order_data)
+    # bulk_create skips Ticket.save() and the post_save counter signal,
+    # seats were validated above so only the counters need updating
+    Ticket.objects.bulk_create(
+        Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+    )
+    for flight_id, count in sold.items():
+        Flight.add_tickets_sold(flight_id, count)
+        invalidate_seat_map(flight_id)
+    # Emails and aggregates are left to the workers, the request only
+    # writes the event
+    record_order_created(order)
+    return order
+
+
+def book_order(order_data, tickets_data) -> Order:
+    """Book the tickets in their own transaction, retrying transient failures.
+
+    Serialization failures and deadlocks are retried with exponential
+    backoff and jitter. A unique constraint violation means a seat was
+    sold by a path that does not take the flight lock, it is reported as
+    a seat conflict (409) listing the seats.
+    """
+    attempts = settings.BOOKING_MAX_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                return book_seats(order_data, tickets_data)
+        except IntegrityError:
+            taken = find_taken_seats(
+                {
+                    (ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"])
+                    for ticket_data in tickets_data
+                }
+            )
+            if taken:
+                raise SeatConflictError(taken)
+            raise
+        except OperationalError as error:
+            if attempt == attempts or not is_retryable(error):
+                raise
+            delay = settings.BOOKING_RETRY_BACKOFF * 2 ** (attempt - 1)
+            logger.warning(
+                "Booking attempt %s failed (%s), retrying in %.3fs",
+                attempt,
+                error,
+                delay,
+            )
+            time.sleep(delay * random.uniform(1, 1.5))
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def version_key(model) -> str:
+    return f"api-cache-version:{model._meta.label_lower}"
+
+
+def read_versions(keys) -> str:
+    """Return the current values of the version keys as one key fragment.
+
+    A version missing from the cache (never set or evicted) starts from the
+    current time, so it can never collide with a version used before.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return ".".join(str(versions[key]) for key in keys)
+
+
+def bump_key(key) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_versions(models) -> str:
+    """Return the current cache versions of the models as one key fragment"""
+    return read_versions([version_key(model) for model in models])
+
+
+def bump_version(model) -> None:
+    """Invalidate every cached response that depends on the model"""
+    bump_key(version_key(model))
+
+
+def invalidate_model(model) -> None:
+    """Bump the cache version of the model once the transaction commits.
+
+    Bumping before the commit would let a concurrent request cache rows
+    it read before the commit under the new version.
+    """
+    transaction.on_commit(partial(bump_version, model))
+
+
+class CachedResponseMixin:
+    """Cache list and retrieve responses of read-mostly reference data.
+
+    Keys carry the versions of every model in ``cache_models``, which the
+    post_save/post_delete signals bump on commit, so a write makes older
+    entries unreachable instead of deleting them one by one. Responses carry an
+    ETag and honour If-None-Match with 304 Not Modified.
+    """
+
+    cache_models = ()
+
+    def get_response_cache_key(self, request) -> str:
+        url = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+        versions = get_versions(self.cache_models)
+        return f"api-response:{self.basename}:{self.action}:{versions}:{url}"
+
+    def cached_response(self, request, build_response):
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = build_response()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            content = json.dumps(response.data, cls=JSONEncoder, sort_keys=True)
+            cached = {
+                "data": response.data,
+                "etag": quote_etag(hashlib.sha1(content.encode()).hexdigest()),
+            }
+            cache.set(key, cached, settings.API_CACHE_TIMEOUT)
+
+        headers = {"ETag": cached["etag"]}
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if "*" in etags or cached["etag"] in etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(cached["data"], headers=headers)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+        )
@@ -0,0 +1,18 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport.models import Ticket
+
+
+def sold_tickets_subquery():
+    """Number of tickets of the outer flight, what Flight.tickets_sold mirrors"""
+    return Coalesce(
+        Subquery(
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(sold=Count("id"))
+            .values("sold")
+        ),
+        0,
+    )
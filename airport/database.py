@@ -0,0 +1,44 @@
+import time
+
+from django.db import connections
+
+SERVER_CONNECTIONS_SQL = """
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE state = 'active'),
+        count(*) FILTER (WHERE state = 'idle'),
+        count(*) FILTER (WHERE state LIKE 'idle in transaction%'),
+        current_setting('max_connections')::int
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+"""
+
+
+def check_database(alias="default") -> float:
+    """Run a trivial query and return its round trip in milliseconds"""
+    started = time.perf_counter()
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def server_connections(alias="default") -> dict | None:
+    """Connections Postgres currently holds for this database.
+
+    Behind pgbouncer these are the server connections of its pool, not the
+    client connections of the workers. None on other databases.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(SERVER_CONNECTIONS_SQL)
+        total, active, idle, idle_in_transaction, max_connections = cursor.fetchone()
+    return {
+        "total": total,
+        "active": active,
+        "idle": idle,
+        "idle_in_transaction": idle_in_transaction,
+        "max_connections": max_connections,
+    }
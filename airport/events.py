@@ -0,0 +1,149 @@
+import logging
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from airport.models import BookingEvent, DailyFlightSales, Order, Ticket
+from user.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def record_order_created(order) -> BookingEvent:
+    """Write the event in the booking transaction, enqueue it once committed"""
+    event = BookingEvent.objects.create(
+        kind=BookingEvent.Kind.ORDER_CREATED, order=order
+    )
+    transaction.on_commit(partial(enqueue, [str(event.idempotency_key)]))
+    return event
+
+
+def enqueue(idempotency_keys) -> None:
+    from airport.tasks import process_booking_events
+
+    try:
+        process_booking_events.delay(idempotency_keys)
+    except Exception:
+        # The order is committed, the periodic sweep picks the event up
+        logger.exception("Could not enqueue booking events %s", idempotency_keys)
+
+
+def booking_reference(event) -> str:
+    return event.idempotency_key.hex[:8].upper()
+
+
+def render_eticket(reference, ticket) -> str:
+    flight = ticket.flight
+    return (
+        f"E-ticket {reference}-{ticket.id}: "
+        f"{flight.route.source.name} -> {flight.route.destination.name}, "
+        f"departure {flight.departure_time:%Y-%m-%d %H:%M} UTC, "
+        f"row {ticket.row}, seat {ticket.seat}"
+    )
+
+
+def confirmation_email(event, order) -> OutgoingEmail:
+    reference = booking_reference(event)
+    etickets = "\n".join(
+        render_eticket(reference, ticket) for ticket in order.tickets.all()
+    )
+    return OutgoingEmail(
+        subject=f"Booking confirmation {reference}",
+        body=f"Thank you for your booking.\n\n{etickets}",
+        to=order.user.email,
+        from_email=settings.DEFAULT_FROM_EMAIL or "",
+    )
+
+
+def update_daily_sales(orders) -> None:
+    tickets = Counter()
+    orders_count = Counter()
+    for order in orders:
+        day = order.created_at.date()
+        flights = Counter(ticket.flight_id for ticket in order.tickets.all())
+        for flight_id, count in flights.items():
+            tickets[flight_id, day] += count
+            orders_count[flight_id, day] += 1
+    # Rows are created empty first, so concurrent workers only ever add
+    DailyFlightSales.objects.bulk_create(
+        (DailyFlightSales(flight_id=flight_id, day=day) for flight_id, day in tickets),
+        ignore_conflicts=True,
+    )
+    for (flight_id, day), count in tickets.items():
+        DailyFlightSales.objects.filter(flight_id=flight_id, day=day).update(
+            tickets=F("tickets") + count,
+            orders=F("orders") + orders_count[flight_id, day],
+        )
+
+
+def process_batch(batch_size) -> int:
+    """Apply one batch of pending events, return how many were handled.
+
+    Events are locked with skip_locked, so parallel workers take disjoint
+    batches. Confirmation emails (with the e-tickets) go to the email
+    outbox and the daily sales are updated in the transaction that marks
+    the events processed.
+    """
+    with transaction.atomic():
+        events = list(
+            BookingEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by("created_at", "id")[:batch_size]
+        )
+        if not events:
+            return 0
+        orders = {
+            order.id: order
+            for order in Order.objects.filter(
+                id__in={event.order_id for event in events}
+            )
+            .select_related("user")
+            .prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "flight__route__source", "flight__route__destination"
+                    ),
+                )
+            )
+        }
+        created = [
+            event for event in events if event.kind == BookingEvent.Kind.ORDER_CREATED
+        ]
+        OutgoingEmail.objects.bulk_create(
+            confirmation_email(event, orders[event.order_id]) for event in created
+        )
+        update_daily_sales(orders[event.order_id] for event in created)
+        BookingEvent.objects.filter(id__in=[event.id for event in events]).update(
+            processed_at=timezone.now()
+        )
+    return len(events)
+
+
+def process_events(idempotency_keys=None, batch_size=None, max_batches=None) -> int:
+    """Work off pending events in batches.
+
+    Every enqueued event starts a run, but a run takes all pending events,
+    so under load one run handles many events and the later runs find
+    their events processed already and stop after one query.
+    """
+    if (
+        idempotency_keys
+        and not BookingEvent.objects.filter(
+            idempotency_key__in=idempotency_keys, processed_at__isnull=True
+        ).exists()
+    ):
+        return 0
+    batch_size = batch_size or settings.BOOKING_EVENT_BATCH_SIZE
+    max_batches = max_batches or settings.BOOKING_EVENT_MAX_BATCHES
+    processed = 0
+    for _ in range(max_batches):
+        handled = process_batch(batch_size)
+        processed += handled
+        if handled < batch_size:
+            break
+    return processed
@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatConflictError(APIException):
+    """Some of the requested seats were sold to another order"""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_code = "seat_conflict"
+
+    def __init__(self, seats):
+        self.seats = sorted(seats)
+        super().__init__("Some of the requested seats are already taken")
+        # Assigned after __init__, which would turn the ids into strings
+        self.detail = {
+            "detail": self.detail,
+            "conflicts": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in self.seats
+            ],
+        }
@@ -0,0 +1,56 @@
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+EXPORT_OUTPUTS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def iterate_represented(values_serializer, queryset, chunk_size):
+    """Yield serialized items reading the rows through a server-side cursor.
+
+    Rows are represented one chunk at a time, so serializers that load
+    related rows per page (orders and their tickets) do it once per chunk.
+    """
+    chunk = []
+    for row in values_serializer.get_rows(queryset).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from values_serializer.represent(chunk)
+            chunk = []
+    if chunk:
+        yield from values_serializer.represent(chunk)
+
+
+def stream_ndjson(items):
+    for item in items:
+        yield json.dumps(item, cls=JSONEncoder) + "\n"
+
+
+def stream_json_array(items):
+    separator = "["
+    for item in items:
+        yield separator + json.dumps(item, cls=JSONEncoder)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+def export_response(request, values_serializer, queryset, filename):
+    """Stream the queryset as NDJSON (default) or one JSON array.
+
+    The output is picked with ``?output=`` since DRF reserves ``?format=``
+    for renderer negotiation.
+    """
+    output = request.query_params.get("output", "ndjson")
+    if output not in EXPORT_OUTPUTS:
+        raise ValidationError({"output": f"Choose one of: {', '.join(EXPORT_OUTPUTS)}"})
+    items = iterate_represented(values_serializer, queryset, settings.EXPORT_CHUNK_SIZE)
+    stream = stream_ndjson if output == "ndjson" else stream_json_array
+    response = StreamingHttpResponse(stream(items), content_type=EXPORT_OUTPUTS[output])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
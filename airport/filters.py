@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def parse_moment(param, value, date_only=False) -> datetime:
+    """Parse a date or datetime query parameter into an aware datetime.
+
+    A date alone resolves to the start of that day in the current time zone.
+    """
+    try:
+        moment = None if date_only else parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is not None:
+                moment = datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        example = "2023-10-11" if date_only else "2023-10-11 or 2023-10-11T20:00"
+        raise ValidationError({param: f"Enter a valid date (ex. {example})"})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class QueryParamFilter:
+    """Chain query parameter filters onto an already optimized queryset.
+
+    ``lookups`` maps a query parameter to the ORM lookup it filters on.
+    Every non-empty parameter narrows the queryset further, so the
+    ``select_related`` calls and annotations of the base queryset survive.
+    A ``filter_<param>`` method takes precedence over the plain lookup.
+    """
+
+    lookups = {}
+
+    def __init__(self, query_params):
+        self.query_params = query_params
+
+    def filter_queryset(self, queryset):
+        for param, lookup in self.lookups.items():
+            value = self.query_params.get(param)
+            if not value:
+                continue
+            method = getattr(self, f"filter_{param}", None)
+            if method:
+                queryset = method(queryset, value)
+            else:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class CityFilter(QueryParamFilter):
+    lookups = {"name": "name__icontains"}
+
+
+class AirplaneFilter(QueryParamFilter):
+    lookups = {"name": "name__icontains"}
+
+
+class AirportFilter(QueryParamFilter):
+    lookups = {"closest_big_city": "closest_big_city__name__icontains"}
+
+
+class RouteFilter(QueryParamFilter):
+    lookups = {
+        "source": "source__name__icontains",
+        "destination": "destination__name__icontains",
+    }
+
+
+class FlightFilter(QueryParamFilter):
+    lookups = {
+        "route_destination": "route__destination__name__icontains",
+        "route_source": "route__source__name__icontains",
+        "departure_time": "departure_time__icontains",
+        "arrival_time": "arrival_time__icontains",
+        "departure_after": "departure_time__gte",
+        "departure_before": "departure_time__lt",
+        "departure_date": "departure_time",
+        "arrival_after": "arrival_time__gte",
+        "arrival_before": "arrival_time__lt",
+        "arrival_date": "arrival_time",
+    }
+
+    def filter_departure_after(self, queryset, value):
+        return queryset.filter(
+            departure_time__gte=parse_moment("departure_after", value)
+        )
+
+    def filter_departure_before(self, queryset, value):
+        return queryset.filter(
+            departure_time__lt=parse_moment("departure_before", value)
+        )
+
+    def filter_departure_date(self, queryset, value):
+        start = parse_moment("departure_date", value, date_only=True)
+        return queryset.filter(
+            departure_time__gte=start, departure_time__lt=start + timedelta(days=1)
+        )
+
+    def filter_arrival_after(self, queryset, value):
+        return queryset.filter(arrival_time__gte=parse_moment("arrival_after", value))
+
+    def filter_arrival_before(self, queryset, value):
+        return queryset.filter(arrival_time__lt=parse_moment("arrival_before", value))
+
+    def filter_arrival_date(self, queryset, value):
+        start = parse_moment("arrival_date", value, date_only=True)
+        return queryset.filter(
+            arrival_time__gte=start, arrival_time__lt=start + timedelta(days=1)
+        )
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from airport.database import server_connections
+
+logger = logging.getLogger("airport.requests")
+
+WORKERS_KEY = "request-metrics:workers"
+SAMPLE_FIELDS = ("total_ms", "db_ms", "queries", "app_ms", "render_ms", "size")
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsStore:
+    """Bounded per-endpoint samples of this process.
+
+    Every worker periodically publishes its snapshot to the cache, so the
+    metrics endpoint can merge the samples of all workers.
+    """
+
+    def __init__(self, max_samples):
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.requests = 0
+        self.connections_opened = 0
+        self.flushed_at = 0.0
+
+    def record(self, endpoint, status_code, sample) -> None:
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    "count": 0,
+                    "errors": 0,
+                    "samples": deque(maxlen=self.max_samples),
+                }
+            stats["count"] += 1
+            stats["errors"] += status_code >= 500
+            stats["samples"].append(sample)
+            self.requests += 1
+
+    def connection_opened(self) -> None:
+        with self.lock:
+            self.connections_opened += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "endpoints": {
+                    endpoint: {
+                        "count": stats["count"],
+                        "errors": stats["errors"],
+                        "samples": list(stats["samples"]),
+                    }
+                    for endpoint, stats in self.endpoints.items()
+                },
+            }
+
+    def publish(self, force=False) -> None:
+        interval = settings.REQUEST_METRICS_FLUSH_INTERVAL
+        now = time.monotonic()
+        if not force and now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        key = f"request-metrics:{os.getpid()}"
+        # Metrics are best effort, an unavailable cache must not fail the
+        # request that happens to publish them
+        try:
+            cache.set(key, self.snapshot(), interval * 10)
+            workers = cache.get(WORKERS_KEY) or []
+            if key not in workers:
+                cache.set(WORKERS_KEY, [*workers, key][-64:], None)
+        except Exception as error:
+            logger.warning("Could not publish request metrics: %s", error)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.endpoints = {}
+            self.requests = 0
+            self.connections_opened = 0
+
+
+metrics = MetricsStore(settings.REQUEST_METRICS_MAX_SAMPLES)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    metrics.connection_opened()
+
+
+def percentiles(values) -> dict:
+    if len(values) < 2:
+        value = values[0] if values else 0
+        return {"p50": value, "p95": value, "p99": value}
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(quantiles[49], 3),
+        "p95": round(quantiles[94], 3),
+        "p99": round(quantiles[98], 3),
+    }
+
+
+def collect_metrics() -> dict:
+    """Merge the published snapshots of every worker into per-endpoint stats"""
+    metrics.publish(force=True)
+    snapshots = cache.get_many(cache.get(WORKERS_KEY) or [])
+    merged = {}
+    requests = connections_opened = 0
+    for snapshot in snapshots.values():
+        requests += snapshot["requests"]
+        connections_opened += snapshot["connections_opened"]
+        for endpoint, stats in snapshot["endpoints"].items():
+            total = merged.setdefault(
+                endpoint, {"count": 0, "errors": 0, "samples": []}
+            )
+            total["count"] += stats["count"]
+            total["errors"] += stats["errors"]
+            total["samples"].extend(stats["samples"])
+
+    endpoints = {}
+    for endpoint, stats in sorted(merged.items()):
+        columns = dict(zip(SAMPLE_FIELDS, zip(*stats["samples"])))
+        endpoints[endpoint] = {
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "samples": len(stats["samples"]),
+            "latency_ms": percentiles(columns["total_ms"]),
+            "db_ms": percentiles(columns["db_ms"]),
+            "queries": percentiles(columns["queries"]),
+            "app_ms": percentiles(columns["app_ms"]),
+            "render_ms": percentiles(columns["render_ms"]),
+            "size_bytes": percentiles(columns["size"]),
+        }
+    database = settings.DATABASES["default"]
+    return {
+        "workers": len(snapshots),
+        "database": {
+            "pool_mode": settings.DB_POOL_MODE,
+            "conn_max_age": database.get("CONN_MAX_AGE", 0),
+            "requests": requests,
+            "connections_opened": connections_opened,
+            "connections_per_request": (
+                round(connections_opened / requests, 3) if requests else None
+            ),
+            "server": server_connections(),
+        },
+        "endpoints": endpoints,
+    }
+
+
+class RequestMetricsMiddleware:
+    """Record query count, DB time, app and render time of every request.
+
+    The numbers are logged as one JSON line on the "airport.requests"
+    logger and kept per endpoint for the staff metrics endpoint; staff
+    users (and everyone with DEBUG on) also get them as a Server-Timing
+    header. ``render`` is the response rendering. Serialization is not
+    timed on its own: ``app`` is the view time without the queries it ran,
+    which approximates it but also covers permissions, filtering and
+    pagination.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        timings = {}
+        request._request_timings = timings
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        render = timings.get("rendered", 0) - timings.get("render_started", 0)
+        view = timings.get("render_started", time.perf_counter()) - timings.get(
+            "view_started", started
+        )
+        sample = (
+            round(total * 1000, 3),
+            round(recorder.duration * 1000, 3),
+            recorder.count,
+            round(max(view - recorder.duration, 0) * 1000, 3),
+            round(render * 1000, 3),
+            0 if response.streaming else len(response.content),
+        )
+        match = getattr(request, "resolver_match", None)
+        endpoint = f"{request.method} {match.view_name if match else 'unmatched'}"
+        metrics.record(endpoint, response.status_code, sample)
+        metrics.publish()
+
+        values = dict(zip(SAMPLE_FIELDS, sample))
+        # DRF sets the authenticated user on the underlying request
+        user = getattr(request, "user", None)
+        if settings.DEBUG or getattr(user, "is_staff", False):
+            response["Server-Timing"] = ", ".join(
+                (
+                    f'db;dur={values["db_ms"]};desc="{values["queries"]} queries"',
+                    f"app;dur={values['app_ms']}",
+                    f"render;dur={values['render_ms']}",
+                    f"total;dur={values['total_ms']}",
+                )
+            )
+        logger.info(
+            json.dumps(
+                {
+                    "endpoint": endpoint,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **values,
+                }
+            )
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = getattr(request, "_request_timings", None)
+        if timings is not None:
+            timings["view_started"] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, "_request_timings", None)
+        if timings is None:
+            return response
+        timings["render_started"] = time.perf_counter()
+        response.add_post_render_callback(
+            lambda _: timings.__setitem__("rendered", time.perf_counter())
+        )
+        return response
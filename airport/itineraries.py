@@ -0,0 +1,287 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from itertools import count
+
+from django.conf import settings
+from django.db import transaction
+
+from airport.cache import get_versions
+from airport.models import Flight, Route
+
+
+class RouteGraph:
+    """In-memory adjacency index of routes between airports.
+
+    ``edges`` maps a source airport id to ``{route_id: (destination_id,
+    distance)}``, so routes can be added and removed one at a time when
+    they change instead of rebuilding the whole graph. The routes of an
+    airport are never modified in place: a change replaces the dict of the
+    one source airport it touches, so searches running in other threads
+    keep iterating the dicts they already looked up.
+    """
+
+    def __init__(self, routes=()):
+        self.edges = {}
+        self.route_sources = {}
+        for route_id, source_id, destination_id, distance in routes:
+            self.add(route_id, source_id, destination_id, distance)
+
+    def add(self, route_id, source_id, destination_id, distance) -> None:
+        self.remove(route_id)
+        self.edges[source_id] = {
+            **self.edges.get(source_id, {}),
+            route_id: (destination_id, distance),
+        }
+        self.route_sources[route_id] = source_id
+
+    def remove(self, route_id) -> None:
+        source_id = self.route_sources.pop(route_id, None)
+        if source_id is not None:
+            routes = dict(self.edges[source_id])
+            del routes[route_id]
+            self.edges[source_id] = routes
+
+    def shortest_paths(self, origin_id, target_id, max_legs, limit) -> list:
+        """Return up to limit simple paths as (distance, [route ids]).
+
+        Paths are expanded Dijkstra-style in order of total distance, so
+        they come out shortest first; max_legs bounds the number of hops.
+        """
+        paths = []
+        queue = [(0, [origin_id], [])]
+        expansions = 0
+        while queue and len(paths) < limit:
+            distance, airports, route_ids = heapq.heappop(queue)
+            airport_id = airports[-1]
+            if airport_id == target_id:
+                if route_ids:
+                    paths.append((distance, route_ids))
+                continue
+            if len(route_ids) == max_legs:
+                continue
+            expansions += 1
+            if expansions > settings.ITINERARY_MAX_EXPANSIONS:
+                break
+            for route_id, (next_id, leg) in self.edges.get(airport_id, {}).items():
+                if next_id not in airports:
+                    heapq.heappush(
+                        queue,
+                        (distance + leg, airports + [next_id], route_ids + [route_id]),
+                    )
+        return paths
+
+
+_graph = None
+_graph_version = None
+_graph_lock = threading.Lock()
+
+
+def get_route_graph() -> RouteGraph:
+    """Return the process-wide graph, rebuilt when routes changed elsewhere.
+
+    The graph remembers the Route cache version it reflects; a version
+    bumped by another process means it missed a change and is rebuilt.
+    """
+    global _graph, _graph_version
+    version = get_versions((Route,))
+    with _graph_lock:
+        if _graph is None or _graph_version != version:
+            _graph = RouteGraph(
+                Route.objects.values_list(
+                    "id", "source_id", "destination_id", "distance"
+                )
+            )
+            _graph_version = version
+        return _graph
+
+
+def apply_route_change(route, deleted) -> None:
+    """Patch a committed route change into the graph if it was already built.
+
+    Runs after the Route cache version was bumped for this change, so the
+    graph is only patched when it was current right before it. A graph
+    rebuilt since the bump already read the committed change.
+    """
+    global _graph, _graph_version
+    version = get_versions((Route,))
+    with _graph_lock:
+        if _graph is None or version == _graph_version:
+            return
+        if int(version) != int(_graph_version) + 1:
+            _graph = None
+            return
+        route_id, source_id, destination_id, distance = route
+        if deleted:
+            _graph.remove(route_id)
+        else:
+            _graph.add(route_id, source_id, destination_id, distance)
+        _graph_version = version
+
+
+def update_route_graph(route, deleted=False) -> None:
+    """Apply a route change to the graph once the transaction commits"""
+    change = (route.id, route.source_id, route.destination_id, route.distance)
+    transaction.on_commit(partial(apply_route_change, change, deleted))
+
+
+def earliest_arrivals(legs, flights_by_route, departures, min_connection) -> list:
+    """Return, per leg, the earliest final arrival reachable from each flight.
+
+    The maximum layover is ignored, so these are lower bounds; flights with
+    no onward connection at all get None.
+    """
+    reach = [None] * len(legs)
+    reach[-1] = [flight.arrival_time for flight in flights_by_route[legs[-1]]]
+    for index in range(len(legs) - 2, -1, -1):
+        onward = reach[index + 1]
+        # suffix[i] is the earliest arrival via the i-th or any later flight
+        suffix = [None] * (len(onward) + 1)
+        for i in range(len(onward) - 1, -1, -1):
+            suffix[i] = min(
+                (arrival for arrival in (onward[i], suffix[i + 1]) if arrival),
+                default=None,
+            )
+        next_departures = departures[legs[index + 1]]
+        reach[index] = [
+            suffix[bisect_left(next_departures, flight.arrival_time + min_connection)]
+            for flight in flights_by_route[legs[index]]
+        ]
+    return reach
+
+
+def chain_flights(paths, flights_by_route, day_end, limit) -> list:
+    """Return up to limit (distance, flights) chains, the fastest first.
+
+    Partial chains of all paths are expanded best-first (A*) on the time
+    from their first departure to the earliest final arrival they can still
+    reach, so a complete chain taken from the heap is never beaten by one
+    found later. The search stops after limit of them, or after
+    ITINERARY_MAX_CHAIN_EXPANSIONS expanded chains, and a chain only grows
+    by the connections that can still make the results. Those bounds
+    ignore the maximum layover, which may in rare cases drop a connection
+    whose onward flight is still reachable only from it.
+    """
+    min_connection = timedelta(minutes=settings.ITINERARY_MIN_CONNECTION_MINUTES)
+    max_layover = timedelta(hours=settings.ITINERARY_MAX_LAYOVER_HOURS)
+    departures = defaultdict(list)
+    for route_id, flights in flights_by_route.items():
+        departures[route_id] = [flight.departure_time for flight in flights]
+    reach = [
+        earliest_arrivals(legs, flights_by_route, departures, min_connection)
+        for _, legs in paths
+    ]
+    order = count()
+    heap = []
+    for path_index, (_, legs) in enumerate(paths):
+        for position, flight in enumerate(flights_by_route[legs[0]]):
+            if flight.departure_time >= day_end:
+                break
+            arrival = reach[path_index][0][position]
+            if arrival is not None:
+                heap.append(
+                    (
+                        arrival - flight.departure_time,
+                        len(legs) - 1,
+                        flight.departure_time,
+                        next(order),
+                        path_index,
+                        position,
+                        [flight],
+                    )
+                )
+    heapq.heapify(heap)
+
+    chains = []
+    expansions = 0
+    while heap and len(chains) < limit:
+        _, stops, departure, _, path_index, _, chain = heapq.heappop(heap)
+        distance, legs = paths[path_index]
+        if len(chain) == len(legs):
+            chains.append((distance, chain))
+            continue
+        expansions += 1
+        if expansions > settings.ITINERARY_MAX_CHAIN_EXPANSIONS:
+            break
+        leg_reach = reach[path_index][len(chain)]
+        arrival = chain[-1].arrival_time
+        route_departures = departures[legs[len(chain)]]
+        connections = [
+            position
+            for position in range(
+                bisect_left(route_departures, arrival + min_connection),
+                bisect_right(route_departures, arrival + max_layover),
+            )
+            if leg_reach[position] is not None
+        ]
+        for position in heapq.nsmallest(
+            limit - len(chains), connections, key=leg_reach.__getitem__
+        ):
+            heapq.heappush(
+                heap,
+                (
+                    leg_reach[position] - departure,
+                    stops,
+                    departure,
+                    next(order),
+                    path_index,
+                    position,
+                    chain + [flights_by_route[legs[len(chain)]][position]],
+                ),
+            )
+    return chains
+
+
+def find_itineraries(origin_id, destination_id, day_start, max_stops, limit) -> list:
+    """Find flight itineraries departing on the day that starts at day_start.
+
+    Candidate airport sequences come from the route graph, then the flights
+    of all candidate routes are loaded with one query and chained in memory.
+    Itineraries are ordered by total travel time, then by number of stops.
+    """
+    paths = get_route_graph().shortest_paths(
+        origin_id, destination_id, max_stops + 1, settings.ITINERARY_MAX_PATHS
+    )
+    if not paths:
+        return []
+    route_ids = {route_id for _, legs in paths for route_id in legs}
+    day_end = day_start + timedelta(days=1)
+    window_end = day_end + max_stops * timedelta(
+        hours=settings.ITINERARY_MAX_LAYOVER_HOURS
+    )
+    flights_by_route = defaultdict(list)
+    flights = Flight.objects.select_related(
+        "route__source", "route__destination", "airplane"
+    ).filter(
+        route_id__in=route_ids,
+        departure_time__gte=day_start,
+        departure_time__lt=window_end,
+    )
+    for flight in flights.order_by("departure_time", "id"):
+        if flight.tickets_available > 0:
+            flights_by_route[flight.route_id].append(flight)
+
+    itineraries = [
+        {
+            "stops": len(chain) - 1,
+            "distance": distance,
+            "departure_time": chain[0].departure_time,
+            "arrival_time": chain[-1].arrival_time,
+            "duration_minutes": int(
+                (chain[-1].arrival_time - chain[0].departure_time).total_seconds() // 60
+            ),
+            "flights": chain,
+        }
+        for distance, chain in chain_flights(paths, flights_by_route, day_end, limit)
+    ]
+    itineraries.sort(
+        key=lambda itinerary: (
+            itinerary["duration_minutes"],
+            itinerary["stops"],
+            itinerary["departure_time"],
+        )
+    )
+    return itineraries
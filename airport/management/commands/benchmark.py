@@ -0,0 +1,175 @@
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from airport.benchmark import SCENARIOS, compare, run_scenarios
+from airport.seeding import SYNTHETIC_EMAIL, generate
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API on a synthetic test database"""
+
+    help = (
+        "Create a test database, fill it with synthetic data and measure "
+        "latency percentiles and query counts of the main endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=200)
+        parser.add_argument("--routes", type=int, default=1000)
+        parser.add_argument("--flights", type=int, default=10000)
+        parser.add_argument("--tickets", type=int, default=100000)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=list(SCENARIOS),
+            help="Scenario to run, may be repeated (default: all)",
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep cached responses between requests instead of measuring "
+            "the uncached path",
+        )
+        parser.add_argument(
+            "--connections",
+            choices=("persistent", "per-request"),
+            default="persistent",
+            help="Reuse one database connection or open a new one for every "
+            "request (like CONN_MAX_AGE = 0)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database (and its data) for the next run",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument("--compare", help="JSON results of a previous run")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Allowed increase in percent before --compare fails",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read {options['compare']}: {error}")
+
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            results = self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "commit": current_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "iterations": options["iterations"],
+                "warm_cache": options["warm_cache"],
+                "connections": options["connections"],
+                "database_host": connection.settings_dict["HOST"],
+                "data": {
+                    key: options[key]
+                    for key in ("airports", "routes", "flights", "tickets")
+                },
+            },
+            "results": results,
+        }
+        self.print_results(results)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if baseline is not None:
+            self.compare_with(results, baseline, options["threshold"])
+
+    def run_benchmark(self, options) -> dict:
+        self.stdout.write("Generating synthetic data...")
+        generate(
+            options["airports"],
+            options["routes"],
+            options["flights"],
+            options["tickets"],
+            seed=options["random_seed"],
+        )
+        user, _ = get_user_model().objects.get_or_create(email=SYNTHETIC_EMAIL)
+        client = APIClient()
+        client.force_authenticate(user)
+        # The scenarios send far more orders than the booking rate allows
+        with override_settings(THROTTLE_ENABLED=False):
+            return run_scenarios(
+                client,
+                options["scenario"] or list(SCENARIOS),
+                options["iterations"],
+                options["warmup"],
+                seed=options["random_seed"],
+                warm_cache=options["warm_cache"],
+                reconnect=options["connections"] == "per-request",
+            )
+
+    def print_results(self, results) -> None:
+        self.stdout.write(
+            f"{'scenario':<15}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<15}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['queries_median']:>10}"
+            )
+
+    def compare_with(self, results, baseline, threshold) -> None:
+        self.stdout.write(f"Compared with {baseline['meta'].get('commit')}:")
+        regressions = []
+        for name, metric, old, new, change, regressed in compare(
+            results, baseline, threshold
+        ):
+            line = f"  {name} {metric}: {old} -> {new} ({change:+.1f}%)"
+            if regressed:
+                regressions.append(line)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) above {threshold}%")
@@ -0,0 +1,100 @@
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+)
+from airport.serializers import FlightListSerializer
+from airport.values_serializers import FlightValuesSerializer
+
+
+class Command(BaseCommand):
+    """Django command comparing the flight list serialization paths"""
+
+    help = (
+        "Serialize N temporary flights with FlightListSerializer and with "
+        "FlightValuesSerializer and report the timings. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def create_flights(self, count) -> None:
+        country = Country.objects.create(name="Benchmark country")
+        city = City.objects.create(name="Benchmark city", country=country)
+        airports = [
+            Airport.objects.create(name=f"Benchmark airport {i}", closest_big_city=city)
+            for i in range(10)
+        ]
+        routes = [
+            Route.objects.create(source=source, destination=destination, distance=500)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ]
+        airplane_type = AirplaneType.objects.create(name="Benchmark type")
+        airplane = Airplane.objects.create(
+            name="Benchmark airplane",
+            airplane_type=airplane_type,
+            rows=30,
+            seats_in_row=6,
+        )
+        start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        Flight.objects.bulk_create(
+            Flight(
+                route=routes[i % len(routes)],
+                airplane=airplane,
+                departure_time=start + timedelta(minutes=10 * i),
+                arrival_time=start + timedelta(minutes=10 * i + 95),
+            )
+            for i in range(count)
+        )
+
+    def measure(self, serialize, repeat) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            self.create_flights(options["flights"])
+            queryset = Flight.objects.select_related(
+                "route__source", "route__destination", "airplane"
+            ).filter(departure_time__year=2030)
+            values_serializer = FlightValuesSerializer()
+
+            model_time = self.measure(
+                lambda: FlightListSerializer(queryset.all(), many=True).data,
+                options["repeat"],
+            )
+            values_time = self.measure(
+                lambda: values_serializer.represent(
+                    values_serializer.get_rows(queryset.all())
+                ),
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{options['flights']} flights, median of {options['repeat']} runs "
+            "(query included)"
+        )
+        self.stdout.write(f"  FlightListSerializer:   {model_time * 1000:.0f} ms")
+        self.stdout.write(f"  FlightValuesSerializer: {values_time * 1000:.0f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(f"Speedup: {model_time / values_time:.1f}x")
+        )
@@ -0,0 +1,125 @@
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from airport.booking import book_order
+from airport.exceptions import SeatConflictError
+from airport.models import Flight, Order, Ticket
+from user.models import OutgoingEmail
+
+# Booking confirmations go to the outbox like real ones, the reserved
+# .invalid domain makes sure none of them could ever be delivered
+LOAD_TEST_EMAIL = "booking-load-test@sky-journey.invalid"
+
+
+class Command(BaseCommand):
+    """Django command to hammer one flight with parallel bookings"""
+
+    help = (
+        "Fire parallel bookings at a single flight and verify that no seat "
+        "is oversold. Meant to run against Postgres, SQLite ignores row locks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("flight", type=int, help="Id of the flight to book")
+        parser.add_argument("--bookings", type=int, default=300)
+        parser.add_argument("--workers", type=int, default=32)
+        parser.add_argument(
+            "--seats-per-order",
+            type=int,
+            default=1,
+            help="Random seats requested by every booking",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the booked orders instead of deleting them afterwards",
+        )
+
+    def book(self, user, flight, seats_per_order):
+        seats = random.sample(
+            [
+                (row, seat)
+                for row in range(1, flight.airplane.rows + 1)
+                for seat in range(1, flight.airplane.seats_in_row + 1)
+            ],
+            seats_per_order,
+        )
+        started = time.perf_counter()
+        try:
+            book_order(
+                {"user": user},
+                [{"flight": flight, "row": row, "seat": seat} for row, seat in seats],
+            )
+            outcome = "booked"
+        except SeatConflictError:
+            outcome = "conflict"
+        except Exception as error:
+            outcome = f"error: {error.__class__.__name__}"
+        finally:
+            connection.close()
+        return outcome, time.perf_counter() - started
+
+    def handle(self, *args, **options) -> None:
+        try:
+            flight = Flight.objects.select_related("airplane").get(id=options["flight"])
+        except Flight.DoesNotExist:
+            raise CommandError(f"Flight {options['flight']} does not exist")
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Running on {connection.vendor}, results do not reflect "
+                    "row-level locking"
+                )
+            )
+
+        user, _ = get_user_model().objects.get_or_create(email=LOAD_TEST_EMAIL)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            results = list(
+                executor.map(
+                    lambda _: self.book(user, flight, options["seats_per_order"]),
+                    range(options["bookings"]),
+                )
+            )
+        elapsed = time.perf_counter() - started
+
+        outcomes = {}
+        for outcome, _ in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        latencies = sorted(latency * 1000 for _, latency in results)
+        self.stdout.write(f"Bookings: {len(results)} in {elapsed:.2f}s")
+        self.stdout.write(f"Throughput: {len(results) / elapsed:.1f} bookings/s")
+        for outcome, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome}: {count}")
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"Latency ms: p50 {quantiles[49]:.1f}, p95 {quantiles[94]:.1f}, "
+                f"p99 {quantiles[98]:.1f}, max {latencies[-1]:.1f}"
+            )
+
+        # Double-sold seats are ruled out by the unique constraint, what can
+        # drift under concurrency is the denormalized counter
+        flight.refresh_from_db()
+        sold = Ticket.objects.filter(flight=flight).count()
+        problems = []
+        if sold > flight.airplane.capacity:
+            problems.append(f"{sold} tickets for {flight.airplane.capacity} seats")
+        if flight.tickets_sold != sold:
+            problems.append(f"counter {flight.tickets_sold}, tickets {sold}")
+
+        # Deleting the orders also drops their unprocessed booking events
+        if not options["keep"]:
+            Order.objects.filter(user=user).delete()
+            user.delete()
+        OutgoingEmail.objects.filter(to=LOAD_TEST_EMAIL).delete()
+
+        if problems:
+            raise CommandError("Inconsistent seats: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("No oversold seats, counter in sync"))
@@ -0,0 +1,87 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Django command to measure the throughput of a running server"""
+
+    help = (
+        "Send GET requests to a URL from parallel keep-alive connections and "
+        "report throughput and latency percentiles. Used to compare server "
+        "setups (runserver, gunicorn, uvicorn workers) on the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url", help="Ex. http://localhost:8000/api/airport/flights/"
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--header",
+            action="append",
+            default=[],
+            help='Extra request header, ex. --header "Authorization: Bearer ..."',
+        )
+
+    def handle(self, *args, **options) -> None:
+        url = urlsplit(options["url"])
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise CommandError(f"Not an http(s) URL: {options['url']}")
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+        headers = {}
+        for header in options["header"]:
+            name, _, value = header.partition(":")
+            headers[name.strip()] = value.strip()
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        local = threading.local()
+
+        def send(_):
+            if getattr(local, "connection", None) is None:
+                local.connection = connection_class(url.netloc, timeout=30)
+            started = time.perf_counter()
+            try:
+                local.connection.request("GET", path, headers=headers)
+                response = local.connection.getresponse()
+                response.read()
+                outcome = str(response.status)
+            except (OSError, http.client.HTTPException) as error:
+                local.connection.close()
+                local.connection = None
+                outcome = f"error: {error.__class__.__name__}"
+            return outcome, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(send, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        outcomes = {}
+        for outcome, _ in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        latencies = sorted(latency * 1000 for _, latency in results)
+        self.stdout.write(
+            f"Requests: {len(results)} in {elapsed:.2f}s "
+            f"with {options['concurrency']} connections"
+        )
+        self.stdout.write(f"Throughput: {len(results) / elapsed:.1f} requests/s")
+        for outcome, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome}: {count}")
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"Latency ms: p50 {quantiles[49]:.1f}, p95 {quantiles[94]:.1f}, "
+                f"p99 {quantiles[98]:.1f}, max {latencies[-1]:.1f}"
+            )
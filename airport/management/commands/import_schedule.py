@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.schedule_import import (
+    SCHEDULE_FORMATS,
+    ScheduleFileError,
+    guess_format,
+    import_schedule,
+)
+
+
+class Command(BaseCommand):
+    """Django command to bulk import flights from a CSV or NDJSON file"""
+
+    help = (
+        "Import flights from a CSV or NDJSON schedule file. Columns: route "
+        "(id) or source and destination (airport names), airplane (id or "
+        "name), departure_time, arrival_time and optional crew (ids)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Schedule file to import")
+        parser.add_argument(
+            "--format",
+            choices=SCHEDULE_FORMATS,
+            help="File format, guessed from the extension by default",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Flights inserted per bulk_create (SCHEDULE_IMPORT_CHUNK_SIZE)",
+        )
+
+    def handle(self, *args, **options) -> None:
+        schedule_format = options["format"] or guess_format(options["path"])
+        if schedule_format is None:
+            raise CommandError("Unknown file format, pass --format csv or ndjson")
+        try:
+            with open(options["path"], "rb") as file:
+                report = import_schedule(file, schedule_format, options["chunk_size"])
+        except (OSError, ScheduleFileError) as error:
+            raise CommandError(error)
+
+        for error in report["errors"]:
+            messages = "; ".join(
+                f"{field}: {message}" for field, message in error["errors"].items()
+            )
+            self.stderr.write(f"Line {error['line']}: {messages}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} flight(s), "
+                f"skipped {len(report['errors'])} invalid row(s)"
+            )
+        )
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.seeding import generate, load_fixture
+
+DEFAULT_FIXTURE = "airport_api_service_fixture.json"
+
+
+class Command(BaseCommand):
+    """Django command to load the fixture and synthetic data in bulk"""
+
+    help = (
+        "Load the airport fixture with bulk inserts, skipping it when the "
+        "same file was loaded before, and optionally generate a synthetic "
+        "data set of the given size for performance testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fixture",
+            default=str(settings.BASE_DIR / DEFAULT_FIXTURE),
+            help="JSON fixture to load (dumpdata format)",
+        )
+        parser.add_argument(
+            "--no-fixture", action="store_true", help="Skip loading the fixture"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load the fixture even if its content hash matches the last load",
+        )
+        parser.add_argument(
+            "--with-users",
+            action="store_true",
+            help="Also load the fixture users (with published passwords) and "
+            "their orders, for local development only",
+        )
+        parser.add_argument("--airports", type=int, default=0)
+        parser.add_argument("--routes", type=int, default=0)
+        parser.add_argument("--flights", type=int, default=0)
+        parser.add_argument("--tickets", type=int, default=0)
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def report(self, label, counts) -> None:
+        if counts is None:
+            self.stdout.write(f"{label}: unchanged since the last load, skipped")
+            return
+        self.stdout.write(self.style.SUCCESS(f"{label}: {sum(counts.values())} rows"))
+        for model, count in counts.items():
+            self.stdout.write(f"  {model}: {count}")
+
+    def handle(self, *args, **options) -> None:
+        if not options["no_fixture"]:
+            fixture = Path(options["fixture"])
+            if not fixture.exists():
+                raise CommandError(f"Fixture {fixture} does not exist")
+            self.report(
+                fixture.name,
+                load_fixture(fixture, options["force"], options["with_users"]),
+            )
+
+        if options["airports"] or options["flights"]:
+            counts = generate(
+                options["airports"],
+                options["routes"],
+                options["flights"],
+                options["tickets"],
+                seed=options["random_seed"],
+                batch_size=options["batch_size"],
+            )
+            self.report("Synthetic data", counts)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from airport.counters import sold_tickets_subquery
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    """Django command to rebuild and verify Flight.tickets_sold counters"""
+
+    help = "Rebuild the per-flight sold-seat counters from the tickets table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report flights whose counter is out of sync",
+        )
+
+    def handle(self, *args, **options) -> None:
+        drifted = (
+            Flight.objects.annotate(actual_sold=sold_tickets_subquery())
+            .exclude(tickets_sold=F("actual_sold"))
+            .values_list("id", "tickets_sold", "actual_sold")
+        )
+        if options["check"]:
+            drifted = list(drifted)
+            for flight_id, tickets_sold, actual_sold in drifted:
+                self.stdout.write(
+                    f"Flight {flight_id}: counter {tickets_sold}, tickets {actual_sold}"
+                )
+            if drifted:
+                raise CommandError(f"{len(drifted)} flight counter(s) out of sync")
+            self.stdout.write(self.style.SUCCESS("All flight counters are in sync"))
+            return
+
+        updated = Flight.objects.filter(id__in=drifted.values("id")).update(
+            tickets_sold=sold_tickets_subquery()
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {updated} flight counter(s)"))
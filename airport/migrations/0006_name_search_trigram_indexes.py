@@ -0,0 +1,45 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_COLUMNS = (
+    ("airport_city", "name"),
+    ("airport_airport", "name"),
+    ("airport_airplane", "name"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes only exist on Postgres, other backends fall back
+    # to the in-memory index in airport.search
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, column in SEARCH_COLUMNS:
+        # Serves word_similarity() ranking and the <% operator
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+        # Serves the UPPER(...) LIKE that Django compiles __icontains into
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_upper_trgm "
+            f"ON {table} USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm")
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_upper_trgm")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0005_flight_arrival_time_index"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,6 +1,10 @@
+from uuid import uuid4
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 
 
 class Crew(models.Model):
@@ -96,10 +100,41 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"], name="flight_departure_id_idx"
+            ),
+            models.Index(fields=["arrival_time"], name="flight_arrival_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.route} (departure: {self.departure_time} - arrival: {self.arrival_time})"
 
+    def save(self, *args, **kwargs) -> None:
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # tickets_sold only moves through add_tickets_sold, writing back
+            # the loaded value could undo bookings made since it was read
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "tickets_sold"
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def tickets_available(self) -> int:
+        return self.airplane.capacity - self.tickets_sold
+
+    @staticmethod
+    def add_tickets_sold(flight_id, count) -> None:
+        """Shift the sold-seat counter of the flight by count in one UPDATE"""
+        Flight.objects.filter(pk=flight_id).update(
+            tickets_sold=Greatest(F("tickets_sold") + count, 0)
+        )
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -107,6 +142,9 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="order_created_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return str(self.created_at)
@@ -155,3 +193,67 @@ class Ticket(models.Model):
         Ticket.validate_seat(
             self.flight, self.seat, "seat", "seats_in_row", ValidationError
         )
+
+
+class SeedRecord(models.Model):
+    """Content hash of the last data set loaded by the seed command"""
+
+    name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.content_hash[:12]})"
+
+
+class BookingEvent(models.Model):
+    """Outbox row written with the order, handled by process_booking_events.
+
+    The idempotency key travels with the event, processed_at is set in the
+    same transaction as the event's side effects, so a redelivered event is
+    never applied twice.
+    """
+
+    class Kind(models.TextChoices):
+        ORDER_CREATED = "order_created"
+
+    idempotency_key = models.UUIDField(default=uuid4, unique=True, editable=False)
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="booking_events"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="booking_event_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.idempotency_key}"
+
+
+class DailyFlightSales(models.Model):
+    """Tickets and orders booked per flight and day, kept by the event worker"""
+
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    day = models.DateField()
+    tickets = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flight", "day"], name="daily_flight_sales_unique"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.flight_id} on {self.day}: {self.tickets} tickets"
@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class DefaultCursorPagination(CursorPagination):
+    """Keyset pagination over the primary key for the airport endpoints"""
+
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+    page_size_query_param = "page_size"
+    ordering = ("id",)
+
+
+class FlightCursorPagination(DefaultCursorPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderCursorPagination(DefaultCursorPagination):
+    ordering = ("-created_at", "id")
+
+
+class CrewCursorPagination(DefaultCursorPagination):
+    ordering = ("last_name", "id")
+
+
+class NameCursorPagination(DefaultCursorPagination):
+    """Alphabetical pages for countries and cities"""
+
+    ordering = ("name", "id")
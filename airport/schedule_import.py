@@ -0,0 +1,218 @@
+import codecs
+import csv
+import io
+import json
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.models import Airplane, Crew, Flight, Route
+
+SCHEDULE_FORMATS = ("csv", "ndjson")
+CREW_SEPARATOR_RE = re.compile(r"[\s,;]+")
+
+
+class RowError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class ScheduleFileError(Exception):
+    """The file as a whole can not be read, nothing was imported"""
+
+
+def guess_format(filename) -> str | None:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    return None
+
+
+def check_encoding(file) -> None:
+    """Raise ScheduleFileError unless the whole file decodes as UTF-8.
+
+    Runs before the first row is read, so a file that breaks off with an
+    undecodable byte is refused instead of being imported halfway.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    position = 0
+    try:
+        for block in iter(lambda: file.read(64 * 1024), b""):
+            decoder.decode(block)
+            position += len(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as error:
+        raise ScheduleFileError(
+            f"The file is not UTF-8 encoded (invalid byte at {position + error.start})"
+        )
+    file.seek(0)
+
+
+def read_rows(file, schedule_format):
+    """Yield (line number, row dict) pairs of a binary CSV or NDJSON file.
+
+    Unreadable lines are yielded with a RowError instead of a dict. A CSV
+    syntax error ends the file, the rows after it are not read.
+    """
+    check_encoding(file)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if schedule_format == "csv":
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as error:
+            # line_num still points at the last line read successfully
+            yield reader.line_num + 1, RowError(
+                {"row": f"Invalid CSV, the rest of the file was skipped: {error}"}
+            )
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = RowError({"row": "Not a valid JSON object"})
+        yield line_number, row
+
+
+class ScheduleImporter:
+    """Validate schedule rows and insert them with bulk_create in chunks.
+
+    Routes, airplanes and crew are resolved through lookup maps loaded once,
+    so validating a row costs no query. A route is given by its id
+    (``route``) or by the airport names (``source`` and ``destination``),
+    an airplane by its id or name, the crew as a list of ids. Invalid rows
+    are reported and skipped, the rest of the file is still imported.
+    """
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or settings.SCHEDULE_IMPORT_CHUNK_SIZE
+        routes = Route.objects.values_list("id", "source__name", "destination__name")
+        self.route_ids = set()
+        self.routes_by_airports = {}
+        for route_id, source, destination in routes:
+            self.route_ids.add(route_id)
+            self.routes_by_airports.setdefault((source, destination), route_id)
+        self.airplane_ids = {}
+        for airplane_id, name in Airplane.objects.values_list("id", "name"):
+            self.airplane_ids[str(airplane_id)] = airplane_id
+            self.airplane_ids.setdefault(name, airplane_id)
+        self.crew_ids = set(Crew.objects.values_list("id", flat=True))
+        self.created = 0
+        self.errors = []
+
+    def resolve_route(self, row) -> int:
+        route = str(row.get("route") or "").strip()
+        if route:
+            if route.isdigit() and int(route) in self.route_ids:
+                return int(route)
+            raise RowError({"route": f"Unknown route {route}"})
+        airports = (
+            str(row.get("source") or "").strip(),
+            str(row.get("destination") or "").strip(),
+        )
+        if not all(airports):
+            raise RowError({"route": "Give a route id or source and destination"})
+        try:
+            return self.routes_by_airports[airports]
+        except KeyError:
+            raise RowError({"route": "No route from {} to {}".format(*airports)})
+
+    def resolve_airplane(self, row) -> int:
+        airplane = str(row.get("airplane") or "").strip()
+        try:
+            return self.airplane_ids[airplane]
+        except KeyError:
+            raise RowError({"airplane": f"Unknown airplane {airplane}"})
+
+    def resolve_crew(self, value) -> list:
+        if value in (None, ""):
+            return []
+        if isinstance(value, str):
+            value = [item for item in CREW_SEPARATOR_RE.split(value) if item]
+        elif not isinstance(value, list):
+            value = [value]
+        try:
+            crew_ids = [int(item) for item in value]
+        except (TypeError, ValueError):
+            raise RowError({"crew": "Enter a list of crew ids"})
+        unknown = [crew_id for crew_id in crew_ids if crew_id not in self.crew_ids]
+        if unknown:
+            raise RowError({"crew": f"Unknown crew {unknown}"})
+        return list(dict.fromkeys(crew_ids))
+
+    def parse_moment(self, row, field):
+        value = str(row.get(field) or "").strip()
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise RowError({field: "Enter a valid datetime (ex. 2023-10-11T20:00)"})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def parse_row(self, row):
+        """Return the unsaved flight and its crew ids or raise RowError"""
+        if isinstance(row, RowError):
+            raise row
+        errors = {}
+        values = {}
+        parsers = (
+            ("route_id", lambda: self.resolve_route(row)),
+            ("airplane_id", lambda: self.resolve_airplane(row)),
+            ("departure_time", lambda: self.parse_moment(row, "departure_time")),
+            ("arrival_time", lambda: self.parse_moment(row, "arrival_time")),
+            ("crew", lambda: self.resolve_crew(row.get("crew"))),
+        )
+        for key, parse in parsers:
+            try:
+                values[key] = parse()
+            except RowError as error:
+                errors.update(error.errors)
+        if not errors and values["arrival_time"] < values["departure_time"]:
+            errors["arrival_time"] = "arrival time can not be less than departure time"
+        if errors:
+            raise RowError(errors)
+        crew = values.pop("crew")
+        return Flight(**values), crew
+
+    def save_chunk(self, chunk) -> None:
+        with transaction.atomic():
+            flights = Flight.objects.bulk_create([flight for flight, _ in chunk])
+            Flight.crew.through.objects.bulk_create(
+                Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+                for flight, crew in chunk
+                for crew_id in crew
+            )
+        self.created += len(flights)
+
+    def import_rows(self, rows) -> dict:
+        chunk = []
+        for line_number, row in rows:
+            try:
+                chunk.append(self.parse_row(row))
+            except RowError as error:
+                self.errors.append({"line": line_number, "errors": error.errors})
+                continue
+            if len(chunk) == self.chunk_size:
+                self.save_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.save_chunk(chunk)
+        return {"created": self.created, "errors": self.errors}
+
+
+def import_schedule(file, schedule_format, chunk_size=None) -> dict:
+    return ScheduleImporter(chunk_size).import_rows(read_rows(file, schedule_format))
@@ -0,0 +1,143 @@
+import re
+import threading
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+WORD_RE = re.compile(r"\w+")
+
+
+def trigrams(text) -> set:
+    """Split text into pg_trgm style trigrams.
+
+    Every word is lower-cased and padded with two spaces in front and one
+    behind, so "Kyiv" yields "  k", " ky", "kyi", "yiv" and "iv ".
+    """
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """In-memory inverted trigram index used when Postgres is not available"""
+
+    def __init__(self, items=()):
+        self.texts = {}
+        self.postings = defaultdict(set)
+        for pk, text in items:
+            self.add(pk, text)
+
+    def add(self, pk, text) -> None:
+        self.remove(pk)
+        self.texts[pk] = text
+        for gram in trigrams(text):
+            self.postings[gram].add(pk)
+
+    def remove(self, pk) -> None:
+        text = self.texts.pop(pk, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            self.postings[gram].discard(pk)
+
+    def search(self, query, threshold, limit) -> list:
+        """Return (pk, score) pairs ranked the way word_similarity() ranks them.
+
+        The score is the share of query trigrams found in the indexed text.
+        Texts containing the query as a substring always match.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        needle = query.lower()
+        matches = []
+        for pk, count in shared.items():
+            score = count / len(query_grams)
+            text = self.texts[pk]
+            if score >= threshold or needle in text.lower():
+                matches.append((pk, score, text))
+        matches.sort(key=lambda match: (-match[1], len(match[2]), match[2]))
+        return [(pk, score) for pk, score, _ in matches[:limit]]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ngram_index(model, field) -> NgramIndex:
+    key = (model._meta.label, field)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = NgramIndex(model._default_manager.values_list("pk", field))
+            _indexes[key] = index
+        return index
+
+
+def reset_ngram_indexes() -> None:
+    """Drop the built indexes, the next search rebuilds them from the database"""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def apply_ngram_change(label, pk, values, deleted) -> None:
+    with _indexes_lock:
+        for (index_label, field), index in _indexes.items():
+            if index_label != label:
+                continue
+            if deleted:
+                index.remove(pk)
+            else:
+                index.add(pk, values[field])
+
+
+def update_ngram_index(model, instance, deleted=False) -> None:
+    """Keep already built fallback indexes in step with committed writes"""
+    values = {
+        field.name: field.value_from_object(instance)
+        for field in model._meta.concrete_fields
+    }
+    transaction.on_commit(
+        partial(apply_ngram_change, model._meta.label, instance.pk, values, deleted)
+    )
+
+
+def search_ids(model, field, query, limit) -> list:
+    """Return primary keys of the rows whose field best matches the query.
+
+    On Postgres this runs through the pg_trgm GIN indexes and the match
+    threshold is the server's pg_trgm.word_similarity_threshold. Elsewhere
+    (e.g. the SQLite test database) it falls back to an in-memory n-gram
+    index using SEARCH_SIMILARITY_THRESHOLD.
+    """
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return list(
+            model._default_manager.filter(
+                Q(**{f"{field}__trigram_word_similar": query})
+                | Q(**{f"{field}__icontains": query})
+            )
+            .annotate(rank=TrigramWordSimilarity(query, field))
+            .order_by("-rank", field)
+            .values_list("pk", flat=True)[:limit]
+        )
+    index = get_ngram_index(model, field)
+    return [
+        pk for pk, _ in index.search(query, settings.SEARCH_SIMILARITY_THRESHOLD, limit)
+    ]
+
+
+def ranked(queryset, ids) -> list:
+    """Fetch the objects for ids, keeping the order of ids"""
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
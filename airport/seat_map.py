@@ -0,0 +1,118 @@
+import base64
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from airport.cache import bump_key, read_versions
+from airport.models import Flight, Ticket
+
+SEAT_MAP_ENCODINGS = ("bitmap", "rle")
+
+
+def seat_map_version_key(flight_id) -> str:
+    return f"seat-map-version:{flight_id}"
+
+
+def seat_map_cache_key(flight_id) -> str:
+    """Key of the flight's current seat map.
+
+    It carries a per-flight version bumped when bookings commit, so a map
+    built from tickets read before the commit is stored under the old
+    version and never served afterwards.
+    """
+    version = read_versions([seat_map_version_key(flight_id)])
+    return f"seat-map:{flight_id}:{version}"
+
+
+def pack_seats(taken, rows, seats_in_row) -> bytes:
+    """Pack taken (row, seat) pairs into a row-major bitset, MSB first.
+
+    Seats outside the airplane, left by tickets booked before the flight
+    moved to a smaller airplane, have no place in the bitset and are skipped.
+    """
+    bitmap = bytearray((rows * seats_in_row + 7) // 8)
+    for row, seat in taken:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        index = (row - 1) * seats_in_row + seat - 1
+        bitmap[index >> 3] |= 0x80 >> (index & 7)
+    return bytes(bitmap)
+
+
+def encode_rle(bitmap, rows, seats_in_row) -> list:
+    """Run-length encode every row of the bitset.
+
+    Each row is a list of run lengths that alternate free and taken seats,
+    always starting with a (possibly empty) run of free seats.
+    """
+    encoded = []
+    for row in range(rows):
+        runs = []
+        current, length = False, 0
+        for seat in range(seats_in_row):
+            index = row * seats_in_row + seat
+            taken = bool(bitmap[index >> 3] & (0x80 >> (index & 7)))
+            if taken != current:
+                runs.append(length)
+                current, length = taken, 0
+            length += 1
+        runs.append(length)
+        encoded.append(runs)
+    return encoded
+
+
+def get_seat_map(flight) -> dict:
+    """Return the occupancy of the flight, cached until its next booking"""
+    key = seat_map_cache_key(flight.id)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        rows = flight.airplane.rows
+        seats_in_row = flight.airplane.seats_in_row
+        taken = list(
+            Ticket.objects.filter(flight_id=flight.id).values_list("row", "seat")
+        )
+        seat_map = {
+            "flight": flight.id,
+            "rows": rows,
+            "seats_in_row": seats_in_row,
+            "taken": len(taken),
+            "bitmap": pack_seats(taken, rows, seats_in_row),
+        }
+        cache.set(key, seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+def represent_seat_map(seat_map, encoding) -> dict:
+    data = {
+        "flight": seat_map["flight"],
+        "rows": seat_map["rows"],
+        "seats_in_row": seat_map["seats_in_row"],
+        "taken": seat_map["taken"],
+        "encoding": encoding,
+    }
+    if encoding == "rle":
+        data["seats"] = encode_rle(
+            seat_map["bitmap"], seat_map["rows"], seat_map["seats_in_row"]
+        )
+    else:
+        data["seats"] = base64.b64encode(seat_map["bitmap"]).decode()
+    return data
+
+
+def invalidate_seat_map(flight_id) -> None:
+    """Bump the flight's seat map version once the transaction commits"""
+    transaction.on_commit(lambda: bump_key(seat_map_version_key(flight_id)))
+
+
+def invalidate_airplane_seat_maps(airplane_id) -> None:
+    """Bump the seat map versions of the airplane's flights on commit"""
+
+    def bump_seat_maps():
+        flight_ids = Flight.objects.filter(airplane_id=airplane_id).values_list(
+            "id", flat=True
+        )
+        for flight_id in flight_ids:
+            bump_key(seat_map_version_key(flight_id))
+
+    transaction.on_commit(bump_seat_maps)
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from airport.cache import invalidate_model
+from airport.counters import sold_tickets_subquery
+from airport.models import (
+    Country,
+    City,
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Order,
+    Ticket,
+    SeedRecord,
+)
+
+# Framework bookkeeping that migrate creates or that only matters to the
+# instance the fixture was dumped from
+SKIPPED_MODELS = {
+    "admin.logentry",
+    "auth.permission",
+    "contenttypes.contenttype",
+    "sessions.session",
+}
+# Fixture users come with published passwords (a superuser among them),
+# they are only loaded on request, together with the rows pointing to them
+USER_MODELS = {"user.user"}
+REFERENCE_MODELS = (Country, City, Airport, AirplaneType, Airplane, Route)
+SYNTHETIC_EMAIL = "seed@sky-journey.local"
+
+
+def content_hash(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+    return digest.hexdigest()
+
+
+def is_loaded(name, digest) -> bool:
+    return SeedRecord.objects.filter(name=name, content_hash=digest).exists()
+
+
+def record_load(name, digest) -> None:
+    SeedRecord.objects.update_or_create(name=name, defaults={"content_hash": digest})
+
+
+def dependent_models(labels) -> set:
+    """Labels of the models pointing to the given ones, directly or not"""
+    labels = set(labels)
+    found = True
+    while found:
+        found = False
+        for model in apps.get_models():
+            if model._meta.label_lower in labels:
+                continue
+            if any(
+                field.many_to_one and field.related_model._meta.label_lower in labels
+                for field in model._meta.concrete_fields
+            ):
+                labels.add(model._meta.label_lower)
+                found = True
+    return labels
+
+
+def dependency_order(model_list) -> list:
+    """Sort models so that every model comes after the models it points to"""
+    ordered = []
+    seen = set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model
+            if field.is_relation and related in model_list and related is not model:
+                visit(related)
+        ordered.append(model)
+
+    for model in model_list:
+        visit(model)
+    return ordered
+
+
+def refresh_derived_data() -> None:
+    """Redo what the skipped save() signals would have done"""
+    Flight.objects.update(tickets_sold=sold_tickets_subquery())
+    for model in REFERENCE_MODELS:
+        invalidate_model(model)
+
+
+def load_fixture(path, force=False, users=False) -> dict | None:
+    """Insert the fixture objects that are not in the database yet.
+
+    Objects are built by the Django deserializer but written with one
+    bulk_create per model instead of one save() per object, rows whose
+    primary key already exists are left alone. Users, and the orders and
+    tickets that belong to them, are only loaded with ``users``. Returns
+    the number of inserted objects per model, or None when the same file
+    was loaded before.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    name = f"fixture:{path.name}"
+    digest = content_hash(data, users)
+    if not force and is_loaded(name, digest):
+        return None
+
+    skipped = (
+        SKIPPED_MODELS if users else SKIPPED_MODELS | dependent_models(USER_MODELS)
+    )
+    objects = [obj for obj in json.loads(data) if obj["model"] not in skipped]
+    by_model = {}
+    for deserialized in serializers.deserialize(
+        "python", objects, ignorenonexistent=True
+    ):
+        by_model.setdefault(type(deserialized.object), []).append(deserialized)
+
+    counts = {}
+    with transaction.atomic():
+        for model in dependency_order(list(by_model)):
+            counts[model._meta.label_lower] = insert_new(model, by_model[model])
+        for model, deserialized_objects in by_model.items():
+            insert_m2m(model, deserialized_objects)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(by_model)):
+                cursor.execute(sql)
+        refresh_derived_data()
+        record_load(name, digest)
+    return counts
+
+
+def insert_new(model, deserialized_objects) -> int:
+    pks = [deserialized.object.pk for deserialized in deserialized_objects]
+    existing = set(model._base_manager.filter(pk__in=pks).values_list("pk", flat=True))
+    new = [
+        deserialized.object
+        for deserialized in deserialized_objects
+        if deserialized.object.pk not in existing
+    ]
+    # bulk_create runs pre_save(), which would replace auto_now(_add)
+    # timestamps with the current time, so they are written back afterwards
+    timestamps = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField)
+        and (field.auto_now or field.auto_now_add)
+    ]
+    original = [[getattr(obj, attname) for attname in timestamps] for obj in new]
+    model._base_manager.bulk_create(new, ignore_conflicts=True)
+    if timestamps and new:
+        for obj, values in zip(new, original):
+            for attname, value in zip(timestamps, values):
+                setattr(obj, attname, value)
+        model._base_manager.bulk_update(new, timestamps)
+    return len(new)
+
+
+def insert_m2m(model, deserialized_objects) -> None:
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        links = [
+            through(
+                **{
+                    field.m2m_column_name(): deserialized.object.pk,
+                    field.m2m_reverse_name(): related_pk,
+                }
+            )
+            for deserialized in deserialized_objects
+            for related_pk in deserialized.m2m_data.get(field.name, ())
+        ]
+        through._base_manager.bulk_create(links, ignore_conflicts=True)
+
+
+def generate(
+    airports, routes, flights, tickets, seed=0, batch_size=5000
+) -> dict | None:
+    """Bulk insert a synthetic data set for performance testing.
+
+    The data only depends on the sizes and the seed, generating the same
+    set twice is skipped.
+    """
+    name = "synthetic"
+    digest = content_hash(airports, routes, flights, tickets, seed)
+    if is_loaded(name, digest):
+        return None
+    rng = random.Random(seed)
+    prefix = f"Synthetic {digest[:8]}"
+
+    with transaction.atomic():
+        countries = Country.objects.bulk_create(
+            Country(name=f"{prefix} country {i}") for i in range(max(1, airports // 50))
+        )
+        cities = City.objects.bulk_create(
+            (
+                City(name=f"{prefix} city {i}", country=rng.choice(countries))
+                for i in range(max(1, airports // 5))
+            ),
+            batch_size=batch_size,
+        )
+        airport_objects = Airport.objects.bulk_create(
+            (
+                Airport(
+                    name=f"{prefix} airport {i}", closest_big_city=rng.choice(cities)
+                )
+                for i in range(max(2, airports))
+            ),
+            batch_size=batch_size,
+        )
+        route_objects = Route.objects.bulk_create(
+            (
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=rng.randint(200, 9000),
+                )
+                for source, destination in (
+                    rng.sample(airport_objects, 2) for _ in range(max(1, routes))
+                )
+            ),
+            batch_size=batch_size,
+        )
+        airplane_types = AirplaneType.objects.bulk_create(
+            AirplaneType(name=f"{prefix} type {i}") for i in range(5)
+        )
+        airplanes = Airplane.objects.bulk_create(
+            Airplane(
+                name=f"{prefix} airplane {i}",
+                rows=rng.randint(20, 40),
+                seats_in_row=rng.choice((4, 6, 8)),
+                airplane_type=rng.choice(airplane_types),
+            )
+            for i in range(max(1, flights // 500))
+        )
+
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        flight_objects = []
+        for _ in range(flights):
+            route = rng.choice(route_objects)
+            departure_time = start + timedelta(minutes=5 * rng.randrange(365 * 288))
+            flight_objects.append(
+                Flight(
+                    route=route,
+                    airplane=rng.choice(airplanes),
+                    departure_time=departure_time,
+                    arrival_time=departure_time
+                    + timedelta(minutes=30 + route.distance // 12),
+                )
+            )
+        flight_objects = Flight.objects.bulk_create(
+            flight_objects, batch_size=batch_size
+        )
+
+        ticket_count = generate_tickets(rng, flight_objects, tickets, batch_size)
+        refresh_derived_data()
+        record_load(name, digest)
+    return {
+        "airport.country": len(countries),
+        "airport.city": len(cities),
+        "airport.airport": len(airport_objects),
+        "airport.route": len(route_objects),
+        "airport.airplanetype": len(airplane_types),
+        "airport.airplane": len(airplanes),
+        "airport.flight": len(flight_objects),
+        "airport.ticket": ticket_count,
+    }
+
+
+def generate_tickets(rng, flights, count, batch_size) -> int:
+    """Sell count random seats spread over the flights, four per order"""
+    if not flights or count <= 0:
+        return 0
+    user, _ = get_user_model().objects.get_or_create(email=SYNTHETIC_EMAIL)
+    per_flight = -(-count // len(flights))
+    created = 0
+    seats = []
+
+    def flush():
+        orders = Order.objects.bulk_create(
+            Order(user=user) for _ in range(-(-len(seats) // 4))
+        )
+        Ticket.objects.bulk_create(
+            Ticket(flight=flight, row=row, seat=seat, order=orders[i // 4])
+            for i, (flight, row, seat) in enumerate(seats)
+        )
+
+    for flight in flights:
+        if created == count:
+            break
+        airplane = flight.airplane
+        sold = min(per_flight, airplane.capacity, count - created)
+        for index in rng.sample(range(airplane.capacity), sold):
+            row, seat = divmod(index, airplane.seats_in_row)
+            seats.append((flight, row + 1, seat + 1))
+        created += sold
+        if len(seats) >= batch_size:
+            flush()
+            seats = []
+    if seats:
+        flush()
+    return created
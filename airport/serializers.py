@@ -1,4 +1,5 @@
-from django.db import transaction
+from collections import Counter
+
 from rest_framework import serializers
 
 from airport.models import (
@@ -13,6 +14,7 @@ from airport.models import (
     Order,
     Ticket,
 )
+from airport.booking import book_order
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -113,7 +115,13 @@ class RouteDetailSerializer(RouteSerializer):
 class FlightSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(FlightSerializer, self).validate(attrs)
-        if attrs["arrival_time"] < attrs["departure_time"]:
+        departure_time = attrs.get(
+            "departure_time", getattr(self.instance, "departure_time", None)
+        )
+        arrival_time = attrs.get(
+            "arrival_time", getattr(self.instance, "arrival_time", None)
+        )
+        if arrival_time < departure_time:
             raise serializers.ValidationError(
                 {"arrival_time": "arrival time can not be less than departure time"}
             )
@@ -141,7 +149,46 @@ class FlightListSerializer(FlightSerializer):
         ]
 
 
+class ItinerarySerializer(serializers.Serializer):
+    stops = serializers.IntegerField()
+    distance = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField()
+    flights = FlightListSerializer(many=True)
+
+
+class BatchFlightField(serializers.PrimaryKeyRelatedField):
+    """Flight reference resolved from the flights prefetched by the batch"""
+
+    def to_internal_value(self, data):
+        flights = getattr(getattr(self.parent, "parent", None), "flights", None)
+        if flights:
+            try:
+                return flights[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """Validate a group of tickets against flights fetched in one query"""
+
+    def to_internal_value(self, data):
+        flight_ids = set()
+        if isinstance(data, list):
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        self.flights = Flight.objects.select_related("airplane").in_bulk(flight_ids)
+        return super().to_internal_value(data)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = BatchFlightField(queryset=Flight.objects.select_related("airplane"))
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_seat(
@@ -164,6 +211,10 @@ class TicketSerializer(serializers.ModelSerializer):
             "seat",
             "flight",
         ]
+        list_serializer_class = TicketBatchSerializer
+        # Seat conflicts are checked for the whole batch in
+        # OrderSerializer.validate_tickets instead of one query per ticket
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -202,13 +253,27 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "tickets", "created_at")
 
-    @transaction.atomic
+    def validate_tickets(self, tickets):
+        """Reject seats requested more than once in the same order.
+
+        Seats sold to other orders are checked by the booking engine under
+        the flight lock and reported as a conflict (409).
+        """
+        seats = Counter(
+            (ticket["flight"].id, ticket["row"], ticket["seat"]) for ticket in tickets
+        )
+        errors = [
+            f"Row {row}, seat {seat} on flight {flight_id} is requested more than once"
+            for (flight_id, row, seat), count in seats.items()
+            if count > 1
+        ]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return tickets
+
     def create(self, validated_data):
         tickets_data = validated_data.pop("tickets")
-        order = Order.objects.create(**validated_data)
-        for ticket_data in tickets_data:
-            Ticket.objects.create(order=order, **ticket_data)
-        return order
+        return book_order(validated_data, tickets_data)
 
 
 class OrderListSerializer(OrderSerializer):
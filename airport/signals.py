@@ -0,0 +1,112 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from airport.cache import invalidate_model
+from airport.itineraries import update_route_graph
+from airport.models import (
+    Flight,
+    Ticket,
+    Country,
+    City,
+    Airport,
+    AirplaneType,
+    Airplane,
+    Route,
+)
+from airport.search import update_ngram_index
+from airport.seat_map import invalidate_airplane_seat_maps, invalidate_seat_map
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, update_fields=None, **kwargs):
+    instance._previous_flight_id = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {"flight", "flight_id"} & set(update_fields):
+        return
+    instance._previous_flight_id = (
+        Ticket.objects.filter(pk=instance.pk)
+        .values_list("flight_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def increment_tickets_sold(sender, instance, created, **kwargs):
+    previous_flight_id = getattr(instance, "_previous_flight_id", None)
+    if created:
+        Flight.add_tickets_sold(instance.flight_id, 1)
+    elif previous_flight_id is not None and previous_flight_id != instance.flight_id:
+        # The ticket moved to another flight, so does its seat
+        Flight.add_tickets_sold(previous_flight_id, -1)
+        Flight.add_tickets_sold(instance.flight_id, 1)
+        invalidate_seat_map(previous_flight_id)
+    invalidate_seat_map(instance.flight_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrement_tickets_sold(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Flight):
+        # Cascade of the flight itself, its counter is deleted with it
+        return
+    Flight.add_tickets_sold(instance.flight_id, -1)
+    invalidate_seat_map(instance.flight_id)
+
+
+def layout_may_change(update_fields, fields) -> bool:
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Flight)
+def invalidate_flight_seat_map(sender, instance, created, update_fields, **kwargs):
+    # The seat map is sized by the airplane, which an update may replace
+    if not created and layout_may_change(update_fields, {"airplane", "airplane_id"}):
+        invalidate_seat_map(instance.id)
+
+
+@receiver(post_save, sender=Airplane)
+def invalidate_airplane_seat_map(sender, instance, created, update_fields, **kwargs):
+    if not created and layout_may_change(update_fields, {"rows", "seats_in_row"}):
+        invalidate_airplane_seat_maps(instance.id)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=Airplane)
+def index_search_name(sender, instance, **kwargs):
+    update_ngram_index(sender, instance)
+
+
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Airplane)
+def unindex_search_name(sender, instance, **kwargs):
+    update_ngram_index(sender, instance, deleted=True)
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Route)
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate_model(sender)
+
+
+# Connected after invalidate_cached_responses, so on commit the Route cache
+# version is already bumped when the route graph is patched
+@receiver(post_save, sender=Route)
+def add_route_to_graph(sender, instance, **kwargs):
+    update_route_graph(instance)
+
+
+@receiver(post_delete, sender=Route)
+def remove_route_from_graph(sender, instance, **kwargs):
+    update_route_graph(instance, deleted=True)
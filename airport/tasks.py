@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from airport.events import process_events
+
+
+@shared_task(ignore_result=True)
+def process_booking_events(idempotency_keys=None):
+    """Handle the given booking events, or sweep all pending ones"""
+    return process_events(idempotency_keys)
@@ -0,0 +1,201 @@
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Sliding window counter: the request is allowed when the count of the
+# current fixed window plus the previous window's count, weighted by how
+# much of it still overlaps the sliding window, stays within the limit.
+# KEYS: previous window, current window
+# ARGV: limit, window duration, seconds elapsed in the current window
+# Returns: allowed (0/1), previous count, current count after the request
+SLIDING_WINDOW_SCRIPT = """
+local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local duration = tonumber(ARGV[2])
+local weight = (duration - tonumber(ARGV[3])) / duration
+if previous * weight + current + 1 > limit then
+    return {0, previous, current}
+end
+current = redis.call('INCR', KEYS[2])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[2], duration * 2)
+end
+return {1, previous, current}
+"""
+
+
+def retry_after(previous, current, limit, duration, elapsed) -> float:
+    """Seconds until the sliding window has room for one more request"""
+    if current + 1 > limit or previous == 0:
+        # Only the next window helps, where this one becomes the previous
+        next_previous = current
+        room = limit - 1
+        if next_previous <= room:
+            return duration - elapsed
+        return duration - elapsed + duration * (1 - room / next_previous)
+    # The previous window's weight has to drop until the count fits
+    return max(duration * (1 - (limit - 1 - current) / previous) - elapsed, 0.0)
+
+
+class LocalThrottleStore:
+    """Process-local store with the same semantics as the Redis script.
+
+    Counters are not shared between workers, meant for tests and for
+    development without Redis.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def hit(self, previous_key, current_key, limit, duration, elapsed) -> tuple:
+        now = time.monotonic()
+        with self.lock:
+            if len(self.counters) > 10000:
+                self.counters = {
+                    key: value for key, value in self.counters.items() if value[1] > now
+                }
+            previous = self.get(previous_key, now)
+            current = self.get(current_key, now)
+            weight = (duration - elapsed) / duration
+            if previous * weight + current + 1 > limit:
+                return False, previous, current
+            expires_at = self.counters.get(current_key, (0, now + duration * 2))[1]
+            current += 1
+            self.counters[current_key] = (current, expires_at)
+            return True, previous, current
+
+    def get(self, key, now) -> int:
+        count, expires_at = self.counters.get(key, (0, 0))
+        return count if expires_at > now else 0
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = {}
+
+
+class RedisThrottleStore:
+    """Counters shared by all workers, checked and updated in one script"""
+
+    def __init__(self, url):
+        import redis
+
+        self.errors = redis.RedisError
+        self.script = redis.Redis.from_url(url).register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, previous_key, current_key, limit, duration, elapsed) -> tuple:
+        try:
+            allowed, previous, current = self.script(
+                keys=[previous_key, current_key], args=[limit, duration, elapsed]
+            )
+        except self.errors as error:
+            # An unavailable throttle store must not take the API down
+            logger.warning("Throttle store unavailable: %s", error)
+            return True, 0, 0
+        return bool(allowed), int(previous), int(current)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = (
+                    RedisThrottleStore(settings.THROTTLE_REDIS_URL)
+                    if settings.THROTTLE_REDIS_URL
+                    else LocalThrottleStore()
+                )
+    return _store
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Rate throttle on sliding window counters in the shared throttle store.
+
+    Every client costs two integer keys per scope, instead of the list of
+    request timestamps SimpleRateThrottle keeps in the cache. Rates come
+    from DEFAULT_THROTTLE_RATES like with the DRF throttles.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def get_rate(self):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"No default throttle rate set for '{self.scope}' scope"
+            )
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if self.rate is None or not settings.THROTTLE_ENABLED:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        elapsed = now - window * self.duration
+        allowed, previous, current = get_store().hit(
+            f"{key}:{window - 1}",
+            f"{key}:{window}",
+            self.num_requests,
+            self.duration,
+            elapsed,
+        )
+        if not allowed:
+            self.retry_after = retry_after(
+                previous, current, self.num_requests, self.duration, elapsed
+            )
+        return allowed
+
+    def wait(self):
+        if self.retry_after is None:
+            return None
+        return math.ceil(self.retry_after)
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottle):
+    """Anonymous requests per IP address, authenticated ones are not counted"""
+
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return super().get_cache_key(request, view)
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Requests per user, or per IP address for anonymous requests"""
+
+    scope = "user"
+
+
+class BookingRateThrottle(SlidingWindowThrottle):
+    scope = "booking"
+
+
+class SearchRateThrottle(SlidingWindowThrottle):
+    scope = "search"
@@ -11,6 +11,7 @@ from airport.views import (
     RouteViewSet,
     FlightViewSet,
     OrderViewSet,
+    ItineraryViewSet,
 )
 
 app_name = "airport"
@@ -25,6 +26,7 @@ router.register("airports", AirportViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
 
 urlpatterns = [
     path("", include(router.urls)),
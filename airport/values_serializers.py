@@ -0,0 +1,142 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from airport.models import Ticket
+
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """Read-only serializer building list items straight from ``.values()`` rows.
+
+    It skips model instances and DRF field introspection. Every subclass
+    must return exactly what the ModelSerializer it stands in for returns,
+    tests/test_values_serializers.py compares the two.
+    """
+
+    lookups = ()
+
+    def get_rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def to_representation(self, row) -> dict:
+        raise NotImplementedError
+
+    def represent(self, rows) -> list:
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+
+class CityValuesSerializer(ValuesSerializer):
+    """Same output as CityListSerializer"""
+
+    lookups = ("id", "name", "country__name")
+
+    def to_representation(self, row) -> dict:
+        return {"id": row["id"], "name": row["name"], "country": row["country__name"]}
+
+
+class RouteValuesSerializer(ValuesSerializer):
+    """Same output as RouteListSerializer"""
+
+    lookups = ("id", "source__name", "destination__name")
+
+    def to_representation(self, row) -> dict:
+        return {"source": row["source__name"], "destination": row["destination__name"]}
+
+
+class FlightValuesSerializer(ValuesSerializer):
+    """Same output as FlightListSerializer"""
+
+    lookups = (
+        "id",
+        "route__source__name",
+        "route__destination__name",
+        "airplane__name",
+        "airplane__rows",
+        "airplane__seats_in_row",
+        "departure_time",
+        "arrival_time",
+        "tickets_sold",
+    )
+
+    def to_representation(self, row, prefix="") -> dict:
+        return {
+            "id": row[prefix + "id"],
+            "route": {
+                "source": row[prefix + "route__source__name"],
+                "destination": row[prefix + "route__destination__name"],
+            },
+            "airplane": row[prefix + "airplane__name"],
+            "departure_time": format_datetime(row[prefix + "departure_time"]),
+            "arrival_time": format_datetime(row[prefix + "arrival_time"]),
+            "tickets_available": row[prefix + "airplane__rows"]
+            * row[prefix + "airplane__seats_in_row"]
+            - row[prefix + "tickets_sold"],
+        }
+
+
+class TicketValuesSerializer(ValuesSerializer):
+    """Same output as TicketListSerializer"""
+
+    lookups = ("id", "row", "seat") + tuple(
+        f"flight__{lookup}" for lookup in FlightValuesSerializer.lookups
+    )
+    flight_serializer = FlightValuesSerializer()
+
+    def to_representation(self, row) -> dict:
+        return {
+            "id": row["id"],
+            "row": row["row"],
+            "seat": row["seat"],
+            "flight": self.flight_serializer.to_representation(row, "flight__"),
+        }
+
+
+class OrderValuesSerializer(ValuesSerializer):
+    """Same output as OrderListSerializer.
+
+    The tickets of a page of orders are loaded with one extra query.
+    """
+
+    lookups = ("id", "created_at")
+    ticket_serializer = TicketValuesSerializer()
+
+    def represent(self, rows) -> list:
+        rows = list(rows)
+        tickets = defaultdict(list)
+        ticket_rows = Ticket.objects.filter(
+            order_id__in=[row["id"] for row in rows]
+        ).values("order_id", *self.ticket_serializer.lookups)
+        for ticket_row in ticket_rows:
+            tickets[ticket_row["order_id"]].append(
+                self.ticket_serializer.to_representation(ticket_row)
+            )
+        return [
+            {
+                "id": row["id"],
+                "tickets": tickets[row["id"]],
+                "created_at": format_datetime(row["created_at"]),
+            }
+            for row in rows
+        ]
+
+
+class ValuesListMixin:
+    """Serve the list action through ``values_serializer_class``.
+
+    The regular serializer classes still describe the API schema and serve
+    every other action.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.values_serializer_class()
+        rows = values_serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.represent(page))
+        return Response(values_serializer.represent(rows))
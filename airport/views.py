@@ -1,9 +1,33 @@
-from django.db.models import F, Count
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, Prefetch, Q, Value, When
+from django.db.models.functions import Least
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, mixins
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import viewsets, mixins, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from airport.cache import CachedResponseMixin
+from airport.export import EXPORT_OUTPUTS, export_response
+from airport.database import check_database
+from airport.instrumentation import collect_metrics
+from airport.filters import (
+    parse_moment,
+    CityFilter,
+    AirplaneFilter,
+    AirportFilter,
+    RouteFilter,
+    FlightFilter,
+)
 from airport.models import (
     Crew,
     Country,
@@ -14,6 +38,7 @@ from airport.models import (
     Route,
     Flight,
     Order,
+    Ticket,
 )
 from airport.serializers import (
     CrewSerializer,
@@ -34,14 +59,107 @@ from airport.serializers import (
     OrderListSerializer,
     CrewListSerializer,
     RouteDetailSerializer,
+    ItinerarySerializer,
+)
+from airport.itineraries import find_itineraries
+from airport.schedule_import import (
+    SCHEDULE_FORMATS,
+    ScheduleFileError,
+    guess_format,
+    import_schedule,
+)
+from airport.pagination import (
+    CrewCursorPagination,
+    FlightCursorPagination,
+    NameCursorPagination,
+    OrderCursorPagination,
+)
+from airport.search import search_ids, ranked
+from airport.throttling import BookingRateThrottle, SearchRateThrottle
+from airport.seat_map import SEAT_MAP_ENCODINGS, get_seat_map, represent_seat_map
+from airport.values_serializers import (
+    ValuesListMixin,
+    CityValuesSerializer,
+    RouteValuesSerializer,
+    FlightValuesSerializer,
+    OrderValuesSerializer,
 )
 from user.permissions import IsAdminOrIfAuthenticatedReadOnly
 
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_PARAMETERS = [
+    OpenApiParameter(
+        name="q",
+        description="Part of the name to look up (ex. ?q=heath)",
+        required=True,
+        type=str,
+    ),
+    OpenApiParameter(
+        name="limit",
+        description="Maximum number of ranked matches (ex. ?limit=5)",
+        required=False,
+        type=int,
+    ),
+]
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        name="output",
+        description=(
+            "ndjson: one JSON object per line (default); "
+            "json: a single JSON array (ex. ?output=json)"
+        ),
+        required=False,
+        type=str,
+        enum=list(EXPORT_OUTPUTS),
+    ),
+]
+
+SEARCH_THROTTLE_CLASSES = (*api_settings.DEFAULT_THROTTLE_CLASSES, SearchRateThrottle)
+
+SCHEDULE_IMPORT_REQUEST = {
+    "multipart/form-data": {
+        "type": "object",
+        "properties": {
+            "file": {"type": "string", "format": "binary"},
+            "format": {"type": "string", "enum": list(SCHEDULE_FORMATS)},
+        },
+        "required": ["file"],
+    }
+}
+
+
+class AutocompleteMixin:
+    """Ranked ``?q=`` name lookup backed by the trigram search indexes"""
+
+    search_field = "name"
+
+    def get_autocomplete_params(self):
+        query = self.request.query_params.get("q", "").strip()
+        try:
+            limit = int(self.request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        return query, max(1, min(limit, settings.AUTOCOMPLETE_MAX_LIMIT))
+
+    @extend_schema(parameters=AUTOCOMPLETE_PARAMETERS)
+    @action(detail=False, methods=["get"], throttle_classes=SEARCH_THROTTLE_CLASSES)
+    def autocomplete(self, request):
+        query, limit = self.get_autocomplete_params()
+        if not query:
+            return Response([])
+        ids = search_ids(self.queryset.model, self.search_field, query, limit)
+        serializer = self.get_serializer(ranked(self.queryset, ids), many=True)
+        return Response(serializer.data)
+
 
 class CrewViewSet(viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = CrewCursorPagination
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -49,24 +167,27 @@ class CrewViewSet(viewsets.ModelViewSet):
         return CrewSerializer
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = NameCursorPagination
+    cache_models = (Country,)
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(
+    CachedResponseMixin, AutocompleteMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     queryset = City.objects.select_related("country")
     serializer_class = CityListSerializer
+    values_serializer_class = CityValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = NameCursorPagination
+    cache_models = (City, Country)
 
     def get_queryset(self):
         """Retrieve the city with filters by name"""
-        queryset = self.queryset
-        name = self.request.query_params.get("name")
-        if name:
-            queryset = City.objects.filter(name__icontains=name)
-        return queryset
+        return CityFilter(self.request.query_params).filter_queryset(self.queryset)
 
     def get_serializer_class(self):
         if self.action in ("create", "update"):
@@ -84,27 +205,25 @@ class CityViewSet(viewsets.ModelViewSet):
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (AirplaneType,)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.select_related("airplane_type")
     serializer_class = AirplaneListSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Airplane, AirplaneType)
 
     def get_queryset(self):
         """Retrieve the airplane filtering by name"""
-        queryset = self.queryset
-        name = self.request.query_params.get("name")
-        if name:
-            queryset = Airplane.objects.filter(name__icontains=name)
-        return queryset
+        return AirplaneFilter(self.request.query_params).filter_queryset(self.queryset)
 
     def get_serializer_class(self):
         if self.action in ("create", "update"):
@@ -112,10 +231,11 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return AirplaneListSerializer
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(CachedResponseMixin, AutocompleteMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.select_related("closest_big_city__country")
     serializer_class = AirportListSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Airport, City)
 
     def get_serializer_class(self):
         if self.action in ("create", "update"):
@@ -124,13 +244,7 @@ class AirportViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve the airports filtering by closest big city"""
-        queryset = self.queryset
-        closest_big_city = self.request.query_params.get("closest_big_city")
-        if closest_big_city:
-            queryset = Airport.objects.filter(
-                closest_big_city__name__icontains=closest_big_city
-            )
-        return queryset
+        return AirportFilter(self.request.query_params).filter_queryset(self.queryset)
 
     @extend_schema(
         parameters=[
@@ -143,32 +257,61 @@ class AirportViewSet(viewsets.ModelViewSet):
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    CachedResponseMixin, AutocompleteMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteListSerializer
+    values_serializer_class = RouteValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Route, Airport)
 
     def get_queryset(self):
         """Retrieve the routs filtering by source, destination"""
-        queryset = self.queryset
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-        if source:
-            queryset = Route.objects.filter(source__name__icontains=source)
-        if destination:
-            queryset = Route.objects.filter(destination__name__icontains=destination)
-        return queryset
+        return RouteFilter(self.request.query_params).filter_queryset(self.queryset)
 
     def get_serializer_class(self):
         if self.action in ("create", "update"):
             return RouteSerializer
-        if self.action == "retrieve":
+        if self.action in ("retrieve", "autocomplete"):
             return RouteDetailSerializer
         return RouteListSerializer
 
+    @extend_schema(parameters=AUTOCOMPLETE_PARAMETERS)
+    @action(detail=False, methods=["get"], throttle_classes=SEARCH_THROTTLE_CLASSES)
+    def autocomplete(self, request):
+        """Routes departing from or arriving at the best matching airports"""
+        query, limit = self.get_autocomplete_params()
+        if not query:
+            return Response([])
+        airport_ids = search_ids(Airport, "name", query, limit)
+        if not airport_ids:
+            return Response([])
+
+        def airport_rank(field):
+            return Case(
+                *(
+                    When(**{field: pk}, then=Value(position))
+                    for position, pk in enumerate(airport_ids)
+                ),
+                default=Value(len(airport_ids)),
+            )
+
+        routes = (
+            self.queryset.filter(
+                Q(source_id__in=airport_ids) | Q(destination_id__in=airport_ids)
+            )
+            .annotate(
+                rank=Least(airport_rank("source_id"), airport_rank("destination_id"))
+            )
+            .order_by("rank", "id")[:limit]
+        )
+        serializer = self.get_serializer(routes, many=True)
+        return Response(serializer.data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -186,46 +329,40 @@ class RouteViewSet(viewsets.ModelViewSet):
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(ValuesListMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.select_related(
         "route__source", "route__destination", "airplane"
     )
     serializer_class = FlightListSerializer
+    values_serializer_class = FlightValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = FlightCursorPagination
 
     def get_queryset(self):
-        """Retrieve the flights filtering by route, departure time and arrival time"""
+        """Retrieve the flights filtering by route, departure time and arrival time.
+
+        Related rows are joined or prefetched to match what the serializer
+        of the current action reads, write actions skip the joins.
+        """
         queryset = self.queryset
-        route_destination = self.request.query_params.get("route_destination")
-        route_source = self.request.query_params.get("route_source")
-        departure_time = self.request.query_params.get("departure_time")
-        arrival_time = self.request.query_params.get("arrival_time")
-        if self.action == "list":
-            queryset = (
-                queryset.select_related("airplane").annotate(
-                    tickets_available=F("airplane__rows") * F("airplane__seats_in_row")
-                    - Count("tickets")
-                )
-            ).order_by("id")
-        if route_destination:
-            queryset = Flight.objects.filter(
-                route__destination__name__icontains=route_destination
-            )
-        if route_source:
-            queryset = Flight.objects.filter(
-                route__source__name__icontains=route_source
+        if self.action == "retrieve":
+            queryset = queryset.select_related(
+                "airplane__airplane_type"
+            ).prefetch_related(
+                "crew",
+                Prefetch(
+                    "tickets", queryset=Ticket.objects.only("row", "seat", "flight_id")
+                ),
             )
-        if departure_time:
-            queryset = Flight.objects.filter(departure_time__icontains=departure_time)
-        if arrival_time:
-            queryset = Flight.objects.filter(arrival_time__icontains=arrival_time)
-        return queryset
+        elif self.action in ("update", "partial_update", "destroy"):
+            queryset = Flight.objects.all()
+        return FlightFilter(self.request.query_params).filter_queryset(queryset)
 
     def get_serializer_class(self):
-        if self.action in ("create", "update"):
+        if self.action in ("create", "update", "partial_update"):
             return FlightSerializer
         if self.action == "retrieve":
             return FlightDetailSerializer
@@ -261,25 +398,134 @@ class FlightViewSet(viewsets.ModelViewSet):
                 required=False,
                 type=str,
             ),
+            OpenApiParameter(
+                name="departure_after",
+                description="Flights with departure at or after the date/datetime (ex. ?departure_after=2023-10-11T08:00)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="departure_before",
+                description="Flights with departure before the date/datetime (ex. ?departure_before=2023-10-12)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="departure_date",
+                description="Flights with departure on the given day (ex. ?departure_date=2023-10-11)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="arrival_after",
+                description="Flights with arrival at or after the date/datetime (ex. ?arrival_after=2023-10-11T08:00)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="arrival_before",
+                description="Flights with arrival before the date/datetime (ex. ?arrival_before=2023-10-12)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="arrival_date",
+                description="Flights with arrival on the given day (ex. ?arrival_date=2023-10-11)",
+                required=False,
+                type=str,
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="encoding",
+                description=(
+                    "bitmap: base64 row-major bitset, one bit per seat (default); "
+                    "rle: free/taken run lengths per row (ex. ?encoding=rle)"
+                ),
+                required=False,
+                type=str,
+            ),
+        ]
+    )
+    @action(detail=True, methods=["get"], url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """Compact occupancy of the flight's seats for seat pickers"""
+        encoding = request.query_params.get("encoding", "bitmap")
+        if encoding not in SEAT_MAP_ENCODINGS:
+            raise ValidationError(
+                {"encoding": f"Choose one of: {', '.join(SEAT_MAP_ENCODINGS)}"}
+            )
+        seat_map = get_seat_map(self.get_object())
+        return Response(represent_seat_map(seat_map, encoding))
+
+    @extend_schema(parameters=EXPORT_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every flight matching the list filters"""
+        queryset = self.get_queryset().order_by("departure_time", "id")
+        return export_response(request, FlightValuesSerializer(), queryset, "flights")
+
+    @extend_schema(request=SCHEDULE_IMPORT_REQUEST, responses={200: None})
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=(IsAdminUser,),
+        parser_classes=(MultiPartParser,),
+    )
+    def import_schedule(self, request):
+        """Bulk import flights from a CSV or NDJSON schedule file, staff only.
+
+        Invalid rows are skipped and reported by line, every valid row is
+        imported.
+        """
+        file = request.FILES.get("file")
+        if file is None:
+            raise ValidationError({"file": "Upload a CSV or NDJSON schedule file"})
+        schedule_format = request.data.get("format") or guess_format(file.name)
+        if schedule_format not in SCHEDULE_FORMATS:
+            raise ValidationError(
+                {"format": f"Choose one of: {', '.join(SCHEDULE_FORMATS)}"}
+            )
+        try:
+            report = import_schedule(file.file, schedule_format)
+        except ScheduleFileError as error:
+            raise ValidationError({"file": str(error)})
+        return Response(report)
 
 
 class OrderViewSet(
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
+    # Tickets come with everything the nested flight serializers read in a
+    # single query, so listing orders costs the same for any ticket count
     queryset = Order.objects.prefetch_related(
-        "tickets__flight__route", "tickets__flight__airplane"
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "flight__route__source",
+                "flight__route__destination",
+                "flight__airplane",
+            ),
+        )
     )
     serializer_class = OrderListSerializer
+    values_serializer_class = OrderValuesSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
+        if self.action == "export":
+            return self.queryset
         queryset = self.queryset.filter(user=self.request.user)
         return queryset
 
@@ -289,5 +535,136 @@ class OrderViewSet(
 
         return OrderListSerializer
 
+    def get_throttles(self):
+        throttles = super().get_throttles()
+        if self.action == "create":
+            throttles.append(BookingRateThrottle())
+        return throttles
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(parameters=EXPORT_PARAMETERS)
+    @action(detail=False, methods=["get"], permission_classes=(IsAdminUser,))
+    def export(self, request):
+        """Stream the orders of all users, staff only"""
+        queryset = self.get_queryset().order_by("id")
+        return export_response(request, OrderValuesSerializer(), queryset, "orders")
+
+
+class ItineraryViewSet(GenericViewSet):
+    serializer_class = ItinerarySerializer
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_classes = SEARCH_THROTTLE_CLASSES
+    pagination_class = None
+
+    def get_search_params(self):
+        params = self.request.query_params
+        errors = {}
+        airports = {}
+        for param in ("from", "to"):
+            try:
+                airports[param] = int(params[param])
+            except (KeyError, ValueError):
+                errors[param] = "Enter the id of an airport (ex. ?from=1)"
+        try:
+            max_stops = int(params.get("max_stops", 1))
+            if not 0 <= max_stops <= settings.ITINERARY_MAX_STOPS:
+                raise ValueError
+        except ValueError:
+            errors["max_stops"] = (
+                f"Enter a number from 0 to {settings.ITINERARY_MAX_STOPS}"
+            )
+        if not errors and airports["from"] == airports["to"]:
+            errors["to"] = "Enter an airport other than the departure airport"
+        if errors:
+            raise ValidationError(errors)
+        day_start = parse_moment("date", params.get("date", ""), date_only=True)
+        return airports["from"], airports["to"], day_start, max_stops
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="from",
+                description="Id of the departure airport (ex. ?from=1)",
+                required=True,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="to",
+                description="Id of the arrival airport (ex. ?to=5)",
+                required=True,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="date",
+                description="Day of the first departure (ex. ?date=2023-10-11)",
+                required=True,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="max_stops",
+                description="Maximum number of connections, 1 by default (ex. ?max_stops=2)",
+                required=False,
+                type=int,
+            ),
+        ]
+    )
+    def list(self, request):
+        """Direct and connecting flights between two airports on a given day"""
+        origin_id, destination_id, day_start, max_stops = self.get_search_params()
+        itineraries = find_itineraries(
+            origin_id,
+            destination_id,
+            day_start,
+            max_stops,
+            settings.ITINERARY_MAX_RESULTS,
+        )
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data)
+
+
+class MetricsView(APIView):
+    """Per-endpoint request counts, latency, query and size percentiles"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=dict)
+    def get(self, request):
+        return Response(collect_metrics())
+
+
+class HealthView(APIView):
+    """Liveness of the database and the cache, 503 when one is down.
+
+    Failures are logged, the anonymous response only carries their status
+    so connection details never leak.
+    """
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
+    @extend_schema(responses=dict)
+    def get(self, request):
+        checks = {}
+        try:
+            checks["database"] = {"status": "ok", "latency_ms": check_database()}
+        except DatabaseError:
+            logger.exception("Health check of the database failed")
+            checks["database"] = {"status": "error"}
+        try:
+            cache.set("health-check", 1, 10)
+            cache_ok = cache.get("health-check") == 1
+        except Exception:
+            logger.exception("Health check of the cache failed")
+            checks["cache"] = {"status": "error"}
+        else:
+            checks["cache"] = {"status": "ok" if cache_ok else "error"}
+        healthy = all(check["status"] == "ok" for check in checks.values())
+        return Response(
+            {"status": "ok" if healthy else "error", **checks},
+            status=(
+                status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE
+            ),
+        )
@@ -0,0 +1,22 @@
+#!/bin/sh
+# Production entrypoint: prepare the database, then serve the API with
+# gunicorn. SERVER=asgi runs asgi.py on uvicorn workers instead of the
+# default wsgi.py on gthread workers.
+set -e
+
+export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-sky-journey-api.settings_production}"
+
+python manage.py wait_for_db
+python manage.py migrate --noinput
+# Reference data only, the fixture users are never loaded here
+if [ "${SEED_ON_START:-false}" = "true" ]; then
+    python manage.py seed
+fi
+python manage.py collectstatic --noinput
+
+if [ "${SERVER:-wsgi}" = "asgi" ]; then
+    exec gunicorn sky-journey-api.asgi:application \
+        --config gunicorn.conf.py \
+        --worker-class uvicorn.workers.UvicornWorker
+fi
+exec gunicorn sky-journey-api.wsgi:application --config gunicorn.conf.py
@@ -0,0 +1,50 @@
+"""Gunicorn settings of the production entrypoint, overridable by env"""
+
+import os
+
+
+def available_cpus() -> int:
+    """CPUs the container may use, honouring a cgroup CPU quota.
+
+    os.cpu_count() reports every CPU of the host even when the container
+    is limited to a few of them.
+    """
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota != "max":
+        cpus = min(cpus, max(1, -(-int(quota) // int(period))))
+    return cpus
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+
+# The usual (2 x CPU) + 1 workers, each with a few threads so that a worker
+# waiting on Postgres or Redis does not block the whole process. Unless
+# pgbouncer pools them, every thread may hold its own database connection,
+# so workers x threads stays within DB_CONNECTION_BUDGET, the share of
+# Postgres max_connections (100 by default) left to the web service.
+workers = available_cpus() * 2 + 1
+if os.getenv("DB_POOL_MODE", "persistent") != "pgbouncer":
+    db_connection_budget = int(os.getenv("DB_CONNECTION_BUDGET", 40))
+    workers = max(1, min(workers, db_connection_budget // threads))
+workers = int(os.getenv("WEB_CONCURRENCY", workers))
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# Recycle workers now and then so slow leaks do not accumulate, the jitter
+# keeps them from restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
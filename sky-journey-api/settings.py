@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "debug_toolbar",
     "rest_framework",
     "drf_spectacular",
@@ -54,6 +55,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "airport.instrumentation.RequestMetricsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -86,16 +88,42 @@ WSGI_APPLICATION = "sky-journey-api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
+DB_POOL_MODES = ("none", "persistent", "pgbouncer")
+
+
+def database_settings(pool_mode, asgi=False) -> dict:
+    """Connection settings of the Postgres database for a pool mode.
+
+    "none" opens a connection per request, "persistent" keeps one per
+    worker thread for DB_CONN_MAX_AGE seconds and checks it before reuse,
+    "pgbouncer" does the same through pgbouncer in transaction pooling
+    mode, where server-side cursors can not be used. Under ASGI
+    connections are never kept, as Django advises against persistent
+    connections there.
+    """
+    if pool_mode not in DB_POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {', '.join(DB_POOL_MODES)}")
+    database = {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        "CONN_MAX_AGE": 0,
     }
-}
+    if pool_mode != "none" and not asgi:
+        database["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+        database["CONN_HEALTH_CHECKS"] = True
+    if pool_mode == "pgbouncer":
+        database["HOST"] = os.getenv("PGBOUNCER_HOST", "pgbouncer")
+        database["PORT"] = os.getenv("PGBOUNCER_PORT", "6432")
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return database
+
+
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "none")
+DATABASES = {"default": database_settings(DB_POOL_MODE)}
 
 if "test" in sys.argv:
     DATABASES["default"] = {
@@ -103,8 +131,35 @@ if "test" in sys.argv:
         "NAME": ":memory:",
     }
 
+# Redis is shared with Celery, without REDIS_CACHE_URL (and in tests) a
+# process-local in-memory cache is used instead
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if os.getenv("REDIS_CACHE_URL") and "test" not in sys.argv:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL"),
+    }
+
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 60 * 60))
+
+
+def show_toolbar(request) -> bool:
+    # The default callback looks up host.docker.internal on every request
+    # before checking DEBUG, which stalls tests and benchmarks on slow DNS
+    from django.conf import settings
+    from debug_toolbar.middleware import show_toolbar as default_show_toolbar
+
+    return settings.DEBUG and default_show_toolbar(request)
+
+
 DEBUG_TOOLBAR_CONFIG = {
     "IS_RUNNING_TESTS": False,
+    "SHOW_TOOLBAR_CALLBACK": show_toolbar,
 }
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -147,18 +202,89 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", 100))
+
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("user.authentication.CachedJWTAuthentication",),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport.throttling.AnonSlidingWindowThrottle",
+        "airport.throttling.UserSlidingWindowThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10000/day", "user": "10000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.getenv("THROTTLE_RATE_ANON", "10000/day"),
+        "user": os.getenv("THROTTLE_RATE_USER", "10000/day"),
+        # Order creation and autocomplete/itinerary search, per user
+        "booking": os.getenv("THROTTLE_RATE_BOOKING", "30/minute"),
+        "search": os.getenv("THROTTLE_RATE_SEARCH", "120/minute"),
+    },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "airport.pagination.DefaultCursorPagination",
+    "PAGE_SIZE": int(os.getenv("PAGINATION_PAGE_SIZE", 20)),
+}
+
+# Throttle counters are shared through Redis when a URL is set, otherwise
+# (and in tests) every process counts on its own
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "true") == "true"
+THROTTLE_REDIS_URL = None
+if "test" not in sys.argv:
+    THROTTLE_REDIS_URL = os.getenv("THROTTLE_REDIS_URL", os.getenv("REDIS_CACHE_URL"))
+
+# Matching threshold of the in-memory search fallback, mirrors the
+# pg_trgm.word_similarity_threshold default used on Postgres
+SEARCH_SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", 0.6))
+AUTOCOMPLETE_MAX_LIMIT = int(os.getenv("AUTOCOMPLETE_MAX_LIMIT", 50))
+
+# Upper bound for a cached seat map, bookings invalidate it right away
+SEAT_MAP_CACHE_TIMEOUT = int(os.getenv("SEAT_MAP_CACHE_TIMEOUT", 60 * 60))
+
+ITINERARY_MAX_STOPS = 3
+ITINERARY_MAX_PATHS = 20
+ITINERARY_MAX_EXPANSIONS = 10000
+ITINERARY_MAX_RESULTS = 20
+# Partial flight chains expanded per search before giving up on more results
+ITINERARY_MAX_CHAIN_EXPANSIONS = 2000
+ITINERARY_MIN_CONNECTION_MINUTES = int(os.getenv("MIN_CONNECTION_MINUTES", 45))
+ITINERARY_MAX_LAYOVER_HOURS = int(os.getenv("MAX_LAYOVER_HOURS", 24))
+
+BOOKING_MAX_ATTEMPTS = int(os.getenv("BOOKING_MAX_ATTEMPTS", 5))
+# Seconds before the first booking retry, doubled on every further attempt
+BOOKING_RETRY_BACKOFF = float(os.getenv("BOOKING_RETRY_BACKOFF", 0.05))
+
+# Booking events handled per transaction and batches per worker run
+BOOKING_EVENT_BATCH_SIZE = int(os.getenv("BOOKING_EVENT_BATCH_SIZE", 200))
+BOOKING_EVENT_MAX_BATCHES = int(os.getenv("BOOKING_EVENT_MAX_BATCHES", 20))
+
+# Per-request query count and timing (Server-Timing header, request log
+# and the staff-only /api/metrics/ endpoint)
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true") == "true"
+# Latest samples kept per endpoint and worker for the percentiles
+REQUEST_METRICS_MAX_SAMPLES = int(os.getenv("REQUEST_METRICS_MAX_SAMPLES", 500))
+# Seconds between two publications of a worker's samples to the cache
+REQUEST_METRICS_FLUSH_INTERVAL = int(os.getenv("REQUEST_METRICS_FLUSH_INTERVAL", 10))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "airport.requests": {
+            "handlers": ["console"],
+            "level": os.getenv(
+                "REQUEST_LOG_LEVEL", "WARNING" if "test" in sys.argv else "INFO"
+            ),
+            "propagate": False,
+        },
+    },
 }
 
+# Rows fetched per round trip from the server-side cursor of an export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Flights inserted per bulk_create (and transaction) by the schedule import
+SCHEDULE_IMPORT_CHUNK_SIZE = int(os.getenv("SCHEDULE_IMPORT_CHUNK_SIZE", 1000))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Sky Journey API",
     "DESCRIPTION": "SkyJourney API is a comprehensive Django-based RESTful web application designed for managing flight bookings and user profiles. ",
@@ -166,6 +292,10 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# Seconds an authenticated user is served from the cache, saving a user
+# drops its entry right away
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 5 * 60))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=1000),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -180,12 +310,63 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 CELERY_BROKER_CONNECTION_RETRY = True
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+# Run tasks in process instead of through the broker, always in tests
+CELERY_TASK_ALWAYS_EAGER = (
+    os.getenv("CELERY_TASK_ALWAYS_EAGER", "false") == "true" or "test" in sys.argv
+)
+CELERY_TASK_EAGER_PROPAGATES = True
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-email-outbox": {
+        "task": "user.tasks.flush_email_outbox",
+        "schedule": float(os.getenv("EMAIL_FLUSH_INTERVAL", 10)),
+    },
+    # Booking events are enqueued on commit, the sweep catches events
+    # whose message was lost
+    "process-booking-events": {
+        "task": "airport.tasks.process_booking_events",
+        "schedule": float(os.getenv("BOOKING_EVENT_SWEEP_INTERVAL", 60)),
+    },
+    "purge-sent-outbox-emails": {
+        "task": "user.tasks.purge_sent_outbox_emails",
+        "schedule": float(os.getenv("EMAIL_PURGE_INTERVAL", 60 * 60)),
+    },
+    "delete-expired-confirmation-tokens": {
+        "task": "user.tasks.delete_expired_confirmation_tokens",
+        "schedule": float(os.getenv("EMAIL_TOKEN_CLEANUP_INTERVAL", 60 * 60)),
+    },
+}
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_USE_TLS = True
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
+# console.EmailBackend, or the local SMTP stand-in of the compose "mail"
+# profile (EMAIL_HOST=mailhog EMAIL_PORT=1025 EMAIL_USE_TLS=false), keeps
+# test runs away from the real relay
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true") == "true"
+EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
+# Outbox emails sent per batch, and batches per flush over one connection
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 100))
+EMAIL_MAX_BATCHES_PER_FLUSH = int(os.getenv("EMAIL_MAX_BATCHES_PER_FLUSH", 50))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+# Seconds before the first retry of a failed email, doubled every attempt
+EMAIL_RETRY_BACKOFF = int(os.getenv("EMAIL_RETRY_BACKOFF", 30))
+# Seconds a flusher owns the emails it claimed
+EMAIL_CLAIM_TIMEOUT = int(os.getenv("EMAIL_CLAIM_TIMEOUT", 300))
+# Sent and failed emails are kept this many days, then purged in batches of
+# EMAIL_PURGE_BATCH_SIZE, at most EMAIL_PURGE_MAX_BATCHES per run
+EMAIL_SENT_RETENTION_DAYS = int(os.getenv("EMAIL_SENT_RETENTION_DAYS", 7))
+EMAIL_PURGE_BATCH_SIZE = int(os.getenv("EMAIL_PURGE_BATCH_SIZE", 1000))
+EMAIL_PURGE_MAX_BATCHES = int(os.getenv("EMAIL_PURGE_MAX_BATCHES", 100))
+# Email confirmation tokens expire after this many hours, a user keeps at
+# most EMAIL_TOKENS_PER_USER of them (older ones are deleted)
+EMAIL_TOKEN_TTL_HOURS = int(os.getenv("EMAIL_TOKEN_TTL_HOURS", 48))
+EMAIL_TOKENS_PER_USER = int(os.getenv("EMAIL_TOKENS_PER_USER", 5))
+# Expired tokens deleted per statement and statements per cleanup run
+EMAIL_TOKEN_CLEANUP_BATCH_SIZE = int(os.getenv("EMAIL_TOKEN_CLEANUP_BATCH_SIZE", 1000))
+EMAIL_TOKEN_CLEANUP_MAX_BATCHES = int(os.getenv("EMAIL_TOKEN_CLEANUP_MAX_BATCHES", 100))
 ACTIVATION_LINK = "http://127.0.0.1:8000/api/user/email-verification?token_id="
@@ -0,0 +1,59 @@
+"""
+Production settings for sky-journey-api project.
+
+Used by the gunicorn entrypoint (DJANGO_SETTINGS_MODULE=
+sky-journey-api.settings_production): debug tooling is removed and
+database connections are kept open between requests.
+"""
+
+import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, INSTALLED_APPS, MIDDLEWARE, database_settings
+
+DEBUG = False
+
+# Cached responses, seat maps and users and the route graph version are
+# shared by all workers through Redis, a per-process cache would leave the
+# other workers serving stale data
+if not os.getenv("REDIS_CACHE_URL"):
+    raise ImproperlyConfigured("REDIS_CACHE_URL must be set in production")
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+    if host.strip()
+]
+CSRF_TRUSTED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware != "debug_toolbar.middleware.DebugToolbarMiddleware"
+]
+
+# Reuse connections between requests unless DB_POOL_MODE says otherwise
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "persistent")
+if "test" not in sys.argv:
+    DATABASES = {
+        **DATABASES,
+        "default": database_settings(
+            DB_POOL_MODE, asgi=os.getenv("SERVER", "wsgi") == "asgi"
+        ),
+    }
+
+STATIC_ROOT = os.getenv("STATIC_ROOT", "/vol/web/static")
+
+# Only behind a proxy that sets X-Forwarded-Proto itself, otherwise any
+# client could mark its plain HTTP request as secure
+SECURE_PROXY_SSL_HEADER = None
+if os.getenv("TRUST_X_FORWARDED_PROTO", "false") == "true":
+    SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -38,6 +39,7 @@ class UnauthorizedUserAirplaneViewSetTest(TestCase):
 
 class AuthorizedUserAirplaneViewSetTest(TestCase):
     def setUp(self):
+        cache.clear()
         user = get_user_model().objects.create_user(
             email="test@email.com", password="password"
         )
@@ -54,7 +56,7 @@ class AuthorizedUserAirplaneViewSetTest(TestCase):
         serializer = AirplaneListSerializer(airplanes, many=True)
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
-        self.assertEqual(result.data, serializer.data)
+        self.assertEqual(result.data["results"], serializer.data)
         self.assertEqual(airplanes.count(), 1)
 
     def test_get_airplanes_filtered_by_name(self):
@@ -69,8 +71,8 @@ class AuthorizedUserAirplaneViewSetTest(TestCase):
         serializer = AirplaneListSerializer(airplane_2)
         serializer_2 = AirplaneSerializer(airplane_1)
 
-        self.assertIn(serializer.data, result.data)
-        self.assertNotIn(serializer_2.data, result.data)
+        self.assertIn(serializer.data, result.data["results"])
+        self.assertNotIn(serializer_2.data, result.data["results"])
 
     def test_retrieve_airplane(self):
         airplane = Airplane.objects.get(pk=1)
@@ -118,6 +120,7 @@ class AuthorizedUserAirplaneViewSetTest(TestCase):
 
 class AdminAirplaneViewSetTest(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         admin = get_user_model().objects.create_superuser(
             email="test@email.com", password="password"
         )
@@ -1,13 +1,17 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from airport.models import Airport, Country, City
+from airport.search import reset_ngram_indexes
 from airport.serializers import AirportListSerializer, AirportSerializer
 
 AIRPORT_URL = reverse("airport:airport-list")
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
 
 
 def detail_url(airport_id):
@@ -34,6 +38,8 @@ class UnauthorizedAirportViewSetTest(TestCase):
 
 class AuthorizedUserAirportViewSetTest(TestCase):
     def setUp(self):
+        cache.clear()
+        reset_ngram_indexes()
         user = get_user_model().objects.create_user(
             email="test@email.com", password="password"
         )
@@ -52,7 +58,7 @@ class AuthorizedUserAirportViewSetTest(TestCase):
         serializer = AirportListSerializer(airports, many=True)
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
-        self.assertEqual(result.data, serializer.data)
+        self.assertEqual(result.data["results"], serializer.data)
         self.assertEqual(airports.count(), 2)
 
     def test_retrieve_airport(self):
@@ -70,7 +76,44 @@ class AuthorizedUserAirportViewSetTest(TestCase):
         result = self.client.get(AIRPORT_URL, {"closest_big_city": "Berlin"})
         serializer = AirportListSerializer(test_airport)
 
-        self.assertIn(serializer.data, result.data)
+        self.assertIn(serializer.data, result.data["results"])
+
+    def test_autocomplete_airports(self):
+        Airport.objects.create(
+            name="Paris Charles de Gaulle", closest_big_city=City.objects.get(pk=2)
+        )
+
+        result = self.client.get(AUTOCOMPLETE_URL, {"q": "pari"})
+        names = [airport["name"] for airport in result.data]
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(names, ["paris Airport 2", "Paris Charles de Gaulle"])
+
+    def test_autocomplete_follows_committed_writes_only(self):
+        self.client.get(AUTOCOMPLETE_URL, {"q": "pari"})
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Airport.objects.get(pk=2).delete()
+                raise RuntimeError
+        rolled_back = self.client.get(AUTOCOMPLETE_URL, {"q": "pari"})
+        airport = Airport.objects.get(pk=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            airport.name = "Orly"
+            airport.save()
+
+        paris = self.client.get(AUTOCOMPLETE_URL, {"q": "pari"})
+        orly = self.client.get(AUTOCOMPLETE_URL, {"q": "orly"})
+
+        self.assertEqual([airport["id"] for airport in rolled_back.data], [2])
+        self.assertEqual(paris.data, [])
+        self.assertEqual([airport["name"] for airport in orly.data], ["Orly"])
+
+    def test_autocomplete_airports_limit_and_empty_query(self):
+        limited = self.client.get(AUTOCOMPLETE_URL, {"q": "airport", "limit": 1})
+        empty = self.client.get(AUTOCOMPLETE_URL, {"q": " "})
+
+        self.assertEqual(len(limited.data), 1)
+        self.assertEqual(empty.data, [])
 
     def test_create_airport_forbidden(self):
         city = City.objects.get(pk=1)
@@ -100,6 +143,7 @@ class AuthorizedUserAirportViewSetTest(TestCase):
 
 class AdminAirportViewSetTest(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         admin = get_user_model().objects.create_superuser(
             email="test@email.com", password="password"
         )
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Country
+from user.authentication import user_cache_key
+
+COUNTRY_URL = reverse("airport:country-list")
+FLIGHT_URL = reverse("airport:flight-list")
+MANAGE_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_served_from_cache(self):
+        with self.assertNumQueries(2):
+            self.client.get(FLIGHT_URL)
+        with self.assertNumQueries(1):
+            result = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        self.client.get(COUNTRY_URL)
+        self.assertEqual(
+            self.client.post(COUNTRY_URL, {"name": "Germany"}).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+        result = self.client.post(COUNTRY_URL, {"name": "Germany"})
+
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Country.objects.filter(name="Germany").exists())
+
+    def test_profile_update_invalidates_the_cache(self):
+        self.client.get(FLIGHT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(MANAGE_URL, {"first_name": "Anna"})
+        with self.assertNumQueries(2):
+            self.client.get(FLIGHT_URL)
+        with self.assertNumQueries(1):
+            self.client.get(FLIGHT_URL)
+
+    def test_cache_is_dropped_only_after_commit(self):
+        self.client.get(COUNTRY_URL)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNotNone(cache.get(user_cache_key(self.user.id)))
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        self.assertIsNone(cache.get(user_cache_key(self.user.id)))
+
+    def test_inactive_and_deleted_users_are_rejected(self):
+        self.client.get(COUNTRY_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        inactive = self.client.get(COUNTRY_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        deleted = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(inactive.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(deleted.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,97 @@
+import random
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.benchmark import (
+    SCENARIOS,
+    OrderCreate,
+    compare,
+    run_scenarios,
+    summarize,
+)
+from airport.models import Flight
+from airport.seeding import SYNTHETIC_EMAIL, generate
+
+
+class BenchmarkTest(TestCase):
+    def test_summarize(self):
+        result = summarize([0.001 * i for i in range(1, 101)], [3, 3, 4])
+
+        self.assertEqual(result["requests"], 100)
+        self.assertAlmostEqual(result["p50_ms"], 50.5)
+        self.assertAlmostEqual(result["p99_ms"], 99.01)
+        self.assertEqual(result["max_ms"], 100)
+        self.assertEqual(result["queries_median"], 3)
+        self.assertEqual(result["queries_max"], 4)
+
+    def test_summarize_single_request(self):
+        result = summarize([0.002], [1])
+
+        self.assertEqual(result["requests"], 1)
+        self.assertEqual(result["p50_ms"], 2)
+        self.assertEqual(result["p99_ms"], 2)
+
+    def test_order_create_stops_when_flights_are_full(self):
+        generate(airports=4, routes=2, flights=2, tickets=10)
+        Flight.objects.update(airplane=Flight.objects.first().airplane)
+        flight = Flight.objects.select_related("airplane").first()
+        flight.airplane.rows, flight.airplane.seats_in_row = 1, 1
+        flight.airplane.save()
+        scenario = OrderCreate("order_create", APIClient(), random.Random(0))
+
+        with self.assertRaises(CommandError):
+            scenario.prepare()
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            "results": {
+                "flight_list": {"p50_ms": 10.0, "queries_median": 1},
+                "order_list": {"p50_ms": 10.0, "queries_median": 2},
+            }
+        }
+        results = {
+            "flight_list": {"p50_ms": 10.5, "queries_median": 1},
+            "order_list": {"p50_ms": 9.0, "queries_median": 5},
+            "route_list": {"p50_ms": 1.0, "queries_median": 1},
+        }
+
+        rows = compare(results, baseline, threshold=10)
+
+        self.assertEqual(
+            [(name, metric, regressed) for name, metric, *_, regressed in rows],
+            [
+                ("flight_list", "p50_ms", False),
+                ("flight_list", "queries_median", False),
+                ("order_list", "p50_ms", False),
+                ("order_list", "queries_median", True),
+            ],
+        )
+
+    def test_run_scenarios(self):
+        generate(airports=10, routes=20, flights=20, tickets=100)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.get(email=SYNTHETIC_EMAIL))
+
+        results = run_scenarios(client, list(SCENARIOS), iterations=3, warmup=1)
+
+        self.assertEqual(list(results), list(SCENARIOS))
+        self.assertEqual(results["flight_list"]["queries_median"], 1)
+        self.assertEqual(results["order_list"]["queries_median"], 2)
+        self.assertEqual(results["order_create"]["requests"], 3)
+
+    def test_reconnect_closes_connection_before_each_request(self):
+        generate(airports=10, routes=20, flights=20, tickets=10)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.get(email=SYNTHETIC_EMAIL))
+
+        with mock.patch.object(connection, "close") as close:
+            run_scenarios(
+                client, ["flight_list"], iterations=3, warmup=1, reconnect=True
+            )
+
+        self.assertEqual(close.call_count, 4)
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase
+
+from airport import booking
+from airport.exceptions import SeatConflictError
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Ticket,
+    Order,
+)
+
+
+class SerializationFailure(Exception):
+    pgcode = "40001"
+
+
+class BookingEngineTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2023-10-11 20:00+00:00",
+            arrival_time="2023-10-12 02:00+00:00",
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+    def tickets(self, *seats):
+        return [
+            {"flight": self.flight, "row": row, "seat": seat} for row, seat in seats
+        ]
+
+    def test_book_order_creates_tickets_and_updates_counter(self):
+        order = booking.book_order({"user": self.user}, self.tickets((2, 1), (2, 2)))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(order.tickets.count(), 2)
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+    def test_unique_violation_from_race_is_reported_as_conflict(self):
+        # The seat check passes as if a concurrent booking had not committed
+        # yet, the unique constraint then rejects the insert
+        real_find_taken_seats = booking.find_taken_seats
+        with patch.object(
+            booking,
+            "find_taken_seats",
+            side_effect=[[], real_find_taken_seats({(self.flight.id, 1, 1)})],
+        ):
+            with self.assertRaises(SeatConflictError) as context:
+                booking.book_order({"user": self.user}, self.tickets((1, 1), (3, 1)))
+
+        self.assertEqual(context.exception.seats, [(self.flight.id, 1, 1)])
+        self.assertEqual(Order.objects.count(), 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+    @patch("airport.booking.time.sleep")
+    def test_serialization_failure_is_retried(self, sleep):
+        error = OperationalError("could not serialize access")
+        error.__cause__ = SerializationFailure()
+        real_book_seats = booking.book_seats
+        calls = []
+
+        def flaky_book_seats(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise error
+            return real_book_seats(*args)
+
+        with patch.object(booking, "book_seats", side_effect=flaky_book_seats):
+            order = booking.book_order({"user": self.user}, self.tickets((4, 4)))
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(order.tickets.get().seat, 4)
+
+    def test_other_operational_errors_are_not_retried(self):
+        with patch.object(
+            booking, "book_seats", side_effect=OperationalError("disk full")
+        ) as book_seats:
+            with self.assertRaises(OperationalError):
+                booking.book_order({"user": self.user}, self.tickets((4, 4)))
+
+        self.assertEqual(book_seats.call_count, 1)
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.events import process_events
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    BookingEvent,
+    DailyFlightSales,
+)
+from user.models import OutgoingEmail
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class BookingEventTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2023-10-11 20:00+00:00",
+            arrival_time="2023-10-12 02:00+00:00",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, *seats):
+        tickets = [{"flight": self.flight.id, "row": 1, "seat": seat} for seat in seats]
+        return self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+    def test_event_is_enqueued_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = self.book(1, 2)
+
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+        event = BookingEvent.objects.get()
+        self.assertEqual(event.order_id, result.data["id"])
+        self.assertIsNone(event.processed_at)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+        # Eager mode runs the worker task right away
+        for callback in callbacks:
+            callback()
+        event.refresh_from_db()
+
+        self.assertIsNotNone(event.processed_at)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, "test@email.com")
+        reference = event.idempotency_key.hex[:8].upper()
+        self.assertEqual(email.subject, f"Booking confirmation {reference}")
+        self.assertIn("Airport 1 -> Airport 2", email.body)
+        self.assertIn("row 1, seat 2", email.body)
+        sales = DailyFlightSales.objects.get()
+        self.assertEqual((sales.flight_id, sales.tickets, sales.orders), (1, 2, 1))
+
+    def test_events_are_processed_in_batches_once(self):
+        for seat in range(1, 5):
+            self.book(seat)
+
+        # Two batches: events, orders and tickets are read, emails, sales
+        # rows, sales counters and events written, inside a savepoint
+        with self.assertNumQueries(2 * 9):
+            processed = process_events(batch_size=3)
+        keys = list(BookingEvent.objects.values_list("idempotency_key", flat=True))
+        with self.assertNumQueries(1):
+            again = process_events([str(key) for key in keys])
+
+        self.assertEqual((processed, again), (4, 0))
+        self.assertEqual(OutgoingEmail.objects.count(), 4)
+        sales = DailyFlightSales.objects.get()
+        self.assertEqual((sales.tickets, sales.orders), (4, 4))
+
+    def test_rejected_booking_records_no_event(self):
+        self.book(1)
+        result = self.book(1)
+
+        self.assertEqual(result.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(BookingEvent.objects.count(), 1)
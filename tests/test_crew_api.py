@@ -45,7 +45,7 @@ class AuthorizedUserCrewViewSetTest(TestCase):
         serializer = CrewListSerializer(members_of_crew, many=True)
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
-        self.assertEqual(result.data, serializer.data)
+        self.assertEqual(result.data["results"], serializer.data)
         self.assertEqual(members_of_crew.count(), 2)
 
     def test_retrieve_member_of_crew(self):
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import EmailConfirmationToken
+from user.tokens import delete_expired_tokens
+
+CONFIRMATION_URL = reverse("user:email-confirmation")
+VERIFICATION_URL = reverse("user:email-verification")
+
+
+@override_settings(EMAIL_TOKEN_TTL_HOURS=48, EMAIL_TOKENS_PER_USER=3)
+class EmailConfirmationTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_token(self, hours_ago=0):
+        token = EmailConfirmationToken.objects.create(user=self.user)
+        EmailConfirmationToken.objects.filter(id=token.id).update(
+            created_at=timezone.now() - timedelta(hours=hours_ago)
+        )
+        return token
+
+    def verify(self, token_id):
+        return self.client.post(f"{VERIFICATION_URL}?token_id={token_id}")
+
+    @mock.patch("user.views.send_email")
+    def test_outstanding_tokens_are_capped(self, send_email):
+        for _ in range(5):
+            result = self.client.post(CONFIRMATION_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(send_email.delay.call_count, 5)
+        self.assertEqual(EmailConfirmationToken.objects.count(), 3)
+        newest = EmailConfirmationToken.objects.latest("created_at")
+        self.assertEqual(send_email.delay.call_args.args[1], newest.id)
+
+    def test_verification_is_one_lookup_and_one_update(self):
+        token = self.create_token()
+
+        with self.assertNumQueries(2):
+            result = self.verify(token.id)
+        self.user.refresh_from_db()
+        again = self.verify(token.id)
+
+        self.assertEqual(result.data, {"message": "Email confirmed"})
+        self.assertTrue(self.user.is_email_confirmed)
+        self.assertEqual(
+            again.data, {"message": "This email has already been verified"}
+        )
+
+    def test_expired_and_malformed_tokens_are_rejected(self):
+        expired = self.create_token(hours_ago=49)
+
+        for token_id in (expired.id, "not-a-uuid", ""):
+            result = self.verify(token_id)
+            self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_email_confirmed)
+
+    def test_expired_tokens_are_deleted_in_batches(self):
+        for _ in range(5):
+            self.create_token(hours_ago=50)
+        fresh = self.create_token()
+
+        with self.assertNumQueries(3 * 2):
+            deleted = delete_expired_tokens(batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(list(EmailConfirmationToken.objects.all()), [fresh])
@@ -0,0 +1,170 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from user.mail import flush_outbox, purge_old_emails, queue_email
+from user.models import OutgoingEmail
+from user.tasks import send_email
+
+
+class FailingBackend(EmailBackend):
+    """Locmem backend that rejects every message to a blocked address"""
+
+    def send_messages(self, messages):
+        if any("blocked@email.com" in message.to for message in messages):
+            raise ConnectionError("recipient refused")
+        return super().send_messages(messages)
+
+
+class ConnectionCountingBackend(FailingBackend):
+    """Opens connections the way the SMTP backend does and counts them"""
+
+    opened = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        self.connection = object()
+        ConnectionCountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, messages):
+        new_connection = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if new_connection:
+                self.close()
+
+
+@override_settings(EMAIL_RETRY_BACKOFF=30, EMAIL_MAX_ATTEMPTS=2)
+class EmailOutboxTest(TestCase):
+    def test_send_email_task_queues_the_message(self):
+        send_email("test@email.com", "token", 1)
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, "test@email.com")
+        self.assertIn("token&user_id=1", email.body)
+        self.assertEqual(mail.outbox, [])
+
+    def test_batches_share_one_connection(self):
+        for i in range(5):
+            queue_email("Subject", "Body", f"user{i}@email.com")
+
+        with mock.patch(
+            "user.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            report = flush_outbox(batch_size=2)
+
+        self.assertEqual(report, {"sent": 5, "errors": 0})
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(
+            OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists()
+        )
+
+    @override_settings(EMAIL_BACKEND="tests.test_email_outbox.FailingBackend")
+    def test_failed_message_is_retried_with_backoff(self):
+        queue_email("Subject", "Body", "blocked@email.com")
+        queue_email("Subject", "Body", "test@email.com")
+
+        report = flush_outbox()
+        blocked = OutgoingEmail.objects.get(to="blocked@email.com")
+
+        self.assertEqual(report, {"sent": 1, "errors": 1})
+        self.assertEqual(blocked.status, OutgoingEmail.Status.PENDING)
+        self.assertEqual(blocked.attempts, 1)
+        self.assertIn("recipient refused", blocked.last_error)
+        self.assertGreater(blocked.next_attempt_at, timezone.now())
+        # Not due yet
+        self.assertEqual(flush_outbox(), {"sent": 0, "errors": 0})
+
+        blocked.next_attempt_at = timezone.now() - timedelta(seconds=1)
+        blocked.save()
+        with self.assertLogs("user.mail", "ERROR"):
+            flush_outbox()
+        blocked.refresh_from_db()
+
+        self.assertEqual(blocked.status, OutgoingEmail.Status.FAILED)
+        self.assertEqual(blocked.attempts, 2)
+        self.assertLessEqual(blocked.next_attempt_at, timezone.now())
+
+    @override_settings(
+        EMAIL_BACKEND="tests.test_email_outbox.ConnectionCountingBackend"
+    )
+    def test_connection_is_reopened_once_after_a_failure(self):
+        ConnectionCountingBackend.opened = 0
+        queue_email("Subject", "Body", "blocked@email.com")
+        for i in range(3):
+            queue_email("Subject", "Body", f"user{i}@email.com")
+
+        report = flush_outbox(batch_size=4)
+
+        self.assertEqual(report, {"sent": 3, "errors": 1})
+        self.assertEqual(ConnectionCountingBackend.opened, 2)
+
+    def test_old_sent_and_failed_emails_are_purged_in_batches(self):
+        for i in range(5):
+            queue_email("Subject", "Body", f"user{i}@email.com")
+        flush_outbox()
+        OutgoingEmail.objects.update(sent_at=timezone.now() - timedelta(days=8))
+        recent = queue_email("Subject", "Body", "recent@email.com")
+        flush_outbox()
+        pending = queue_email("Subject", "Body", "pending@email.com")
+        for days in (8, 1):
+            OutgoingEmail.objects.create(
+                subject="Subject",
+                body="Body",
+                to="blocked@email.com",
+                status=OutgoingEmail.Status.FAILED,
+                next_attempt_at=timezone.now() - timedelta(days=days),
+            )
+        recent_failed = OutgoingEmail.objects.latest("id")
+
+        with self.assertNumQueries(4 * 2):
+            deleted = purge_old_emails(batch_size=2)
+
+        self.assertEqual(deleted, 6)
+        self.assertEqual(
+            set(OutgoingEmail.objects.values_list("id", flat=True)),
+            {recent.id, pending.id, recent_failed.id},
+        )
+
+    def test_purge_stops_after_max_batches(self):
+        for i in range(3):
+            queue_email("Subject", "Body", f"user{i}@email.com")
+        flush_outbox()
+        OutgoingEmail.objects.update(sent_at=timezone.now() - timedelta(days=8))
+
+        self.assertEqual(purge_old_emails(batch_size=1, max_batches=2), 2)
+
+    def test_email_load_test_command(self):
+        out = io.StringIO()
+
+        call_command("email_load_test", messages=7, batch_size=3, stdout=out)
+
+        self.assertIn("Sent 7 email(s) with 0 error(s)", out.getvalue())
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_email_load_test_leaves_other_mail_queued(self):
+        queue_email("Subject", "Body", "test@email.com")
+
+        call_command("email_load_test", messages=0, stdout=io.StringIO())
+
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            OutgoingEmail.objects.get().status, OutgoingEmail.Status.PENDING
+        )
@@ -0,0 +1,126 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Ticket,
+    Order,
+)
+from airport.serializers import FlightListSerializer, OrderListSerializer
+
+FLIGHT_EXPORT_URL = reverse("airport:flight-export")
+ORDER_EXPORT_URL = reverse("airport:order-export")
+
+
+def read_stream(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        for day in (13, 11, 12):
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=f"2023-10-{day} 20:00+00:00",
+                arrival_time=f"2023-10-{day} 23:00+00:00",
+            )
+        for user, row in ((self.user, 1), (self.admin, 2), (self.user, 3)):
+            order = Order.objects.create(user=user)
+            Ticket.objects.create(row=row, seat=1, flight_id=1, order=order)
+            Ticket.objects.create(row=row, seat=2, flight_id=2, order=order)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_flights_export_ndjson(self):
+        result = self.client.get(FLIGHT_EXPORT_URL)
+        lines = read_stream(result).splitlines()
+        flights = Flight.objects.order_by("departure_time", "id")
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertTrue(result.streaming)
+        self.assertEqual(result["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="flights.ndjson"', result["Content-Disposition"])
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            json.loads(json.dumps(FlightListSerializer(flights, many=True).data)),
+        )
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_flights_export_json_array(self):
+        result = self.client.get(FLIGHT_EXPORT_URL, {"output": "json"})
+        flights = json.loads(read_stream(result))
+
+        self.assertEqual(result["Content-Type"], "application/json")
+        self.assertEqual([flight["id"] for flight in flights], [2, 3, 1])
+
+    def test_flights_export_applies_filters(self):
+        result = self.client.get(
+            FLIGHT_EXPORT_URL, {"output": "json", "departure_date": "2023-10-12"}
+        )
+
+        self.assertEqual(
+            [flight["id"] for flight in json.loads(read_stream(result))], [3]
+        )
+
+    def test_empty_json_array(self):
+        result = self.client.get(
+            FLIGHT_EXPORT_URL, {"output": "json", "departure_date": "2024-01-01"}
+        )
+
+        self.assertEqual(json.loads(read_stream(result)), [])
+
+    def test_invalid_output(self):
+        result = self.client.get(FLIGHT_EXPORT_URL, {"output": "csv"})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_orders_export_is_staff_only(self):
+        result = self.client.get(ORDER_EXPORT_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_orders_export_streams_all_users_orders(self):
+        self.client.force_authenticate(self.admin)
+        result = self.client.get(ORDER_EXPORT_URL)
+        with CaptureQueriesContext(connection) as queries:
+            lines = read_stream(result).splitlines()
+        orders = Order.objects.order_by("id")
+
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            json.loads(json.dumps(OrderListSerializer(orders, many=True).data)),
+        )
+        # The order rows plus one ticket query for each chunk of two orders
+        self.assertEqual(len(queries), 3)
@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -13,7 +16,11 @@ from airport.models import (
     Airplane,
     Flight,
     Crew,
+    Order,
+    Ticket,
 )
+from airport.pagination import FlightCursorPagination
+from airport.seat_map import get_seat_map, seat_map_cache_key
 from airport.serializers import (
     FlightListSerializer,
     FlightDetailSerializer,
@@ -27,6 +34,10 @@ def detail_url(flight_id):
     return reverse("airport:flight-detail", args=[flight_id])
 
 
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=[flight_id])
+
+
 class UnauthorizedFlightViewSetTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -82,13 +93,13 @@ class AuthorizedUserFlightViewSetTest(TestCase):
 
     def test_get_flight_list(self):
         result = self.client.get(FLIGHT_URL)
-        flights = Flight.objects.all()
+        flights = Flight.objects.order_by("departure_time", "id")
         serializer = FlightListSerializer(flights, many=True)
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
         self.assertEqual(flights.count(), 2)
-        self.assertEqual(result.data[0]["id"], serializer.data[0]["id"])
-        self.assertEqual(result.data[1]["id"], serializer.data[1]["id"])
+        self.assertEqual(result.data["results"][0]["id"], serializer.data[0]["id"])
+        self.assertEqual(result.data["results"][1]["id"], serializer.data[1]["id"])
 
     def test_retrieve_flight(self):
         flight = Flight.objects.get(pk=1)
@@ -105,30 +116,93 @@ class AuthorizedUserFlightViewSetTest(TestCase):
         result = self.client.get(FLIGHT_URL, {"route_source": f"berlin Airport"})
         serializer = FlightListSerializer([flight_1], many=True)
 
-        self.assertEqual(serializer.data, result.data)
+        self.assertEqual(serializer.data, result.data["results"])
 
     def test_get_flights_filtered_by_route_destination(self):
         flight_1 = Flight.objects.get(pk=1)
         flight_2 = Flight.objects.get(pk=2)
 
         result = self.client.get(FLIGHT_URL, {"route_destination": f"paris Airport 2"})
-        serializer = FlightListSerializer([flight_1, flight_2], many=True)
+        serializer = FlightListSerializer([flight_2, flight_1], many=True)
 
-        self.assertEqual(serializer.data, result.data)
+        self.assertEqual(serializer.data, result.data["results"])
 
     def test_get_flights_filtered_by_departure_time(self):
         flight_1 = Flight.objects.get(pk=1)
         result = self.client.get(FLIGHT_URL, {"departure_time": f"2023-10-11"})
         serializer = FlightListSerializer([flight_1], many=True)
 
-        self.assertEqual(serializer.data, result.data)
+        self.assertEqual(serializer.data, result.data["results"])
 
     def test_get_flights_filtered_by_arrival_time(self):
         flight_2 = Flight.objects.get(pk=2)
         result = self.client.get(FLIGHT_URL, {"arrival_time": f"2023-01-10"})
         serializer = FlightListSerializer([flight_2], many=True)
 
-        self.assertEqual(serializer.data, result.data)
+        self.assertEqual(serializer.data, result.data["results"])
+
+    def test_get_flights_filtered_by_departure_range(self):
+        flight_1 = Flight.objects.get(pk=1)
+        result = self.client.get(
+            FLIGHT_URL,
+            {"departure_after": "2023-10-01", "departure_before": "2023-10-11T21:00"},
+        )
+        serializer = FlightListSerializer([flight_1], many=True)
+
+        self.assertEqual(serializer.data, result.data["results"])
+
+    def test_get_flights_filtered_by_departure_and_arrival_date(self):
+        flight_1 = Flight.objects.get(pk=1)
+        flight_2 = Flight.objects.get(pk=2)
+
+        departures = self.client.get(FLIGHT_URL, {"departure_date": "2023-01-09"})
+        arrivals = self.client.get(FLIGHT_URL, {"arrival_date": "2023-10-12"})
+
+        self.assertEqual(
+            FlightListSerializer([flight_2], many=True).data,
+            departures.data["results"],
+        )
+        self.assertEqual(
+            FlightListSerializer([flight_1], many=True).data, arrivals.data["results"]
+        )
+
+    def test_invalid_date_range_param(self):
+        result = self.client.get(FLIGHT_URL, {"arrival_after": "tomorrow"})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("arrival_after", result.data)
+
+    def test_get_flights_filtered_by_several_params(self):
+        result = self.client.get(
+            FLIGHT_URL,
+            {"route_destination": "paris Airport", "departure_time": "2023-01-09"},
+        )
+        flight_2 = Flight.objects.get(pk=2)
+        serializer = FlightListSerializer([flight_2], many=True)
+
+        self.assertEqual(serializer.data, result.data["results"])
+
+    def test_filtered_flight_list_keeps_select_related(self):
+        with self.assertNumQueries(1):
+            result = self.client.get(FLIGHT_URL, {"route_source": "Airport"})
+
+        self.assertEqual(len(result.data["results"]), 2)
+
+    def test_flight_list_cursor_pagination(self):
+        first_page = self.client.get(FLIGHT_URL, {"page_size": 1})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(len(first_page.data["results"]), 1)
+        self.assertEqual(first_page.data["results"][0]["id"], 2)
+        self.assertEqual(second_page.data["results"][0]["id"], 1)
+        self.assertIsNone(second_page.data["next"])
+
+    @patch.object(FlightCursorPagination, "max_page_size", 1)
+    def test_flight_list_page_size_is_capped(self):
+        result = self.client.get(FLIGHT_URL, {"page_size": 1000})
+
+        self.assertEqual(len(result.data["results"]), 1)
+        self.assertIsNotNone(result.data["next"])
 
     def test_create_flight_forbidden(self):
         route = Route.objects.get(pk=1)
@@ -271,3 +345,230 @@ class AdminFlightViewSetTest(TestCase):
             result.data,
             {"arrival_time": ["arrival time can not be less than departure time"]},
         )
+
+
+class FlightSeatMapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        self.airplane_type = AirplaneType.objects.create(name="Boing 777")
+        self.airplane = Airplane.objects.create(
+            name="test airplane",
+            airplane_type=self.airplane_type,
+            rows=3,
+            seats_in_row=4,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time="2023-10-11 20:00+00:00",
+            arrival_time="2023-10-12 02:00+00:00",
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=order)
+        Ticket.objects.create(row=2, seat=4, flight=self.flight, order=order)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_seat_map_bitmap(self):
+        result = self.client.get(seat_map_url(self.flight.id))
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data["rows"], 3)
+        self.assertEqual(result.data["seats_in_row"], 4)
+        self.assertEqual(result.data["taken"], 3)
+        # 1000 0011 0000 -> 0x83 0x00
+        self.assertEqual(result.data["seats"], "gwA=")
+
+    def test_seat_map_rle(self):
+        result = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+
+        self.assertEqual(result.data["seats"], [[0, 1, 3], [2, 2], [4]])
+
+    def test_seat_map_invalid_encoding(self):
+        result = self.client.get(seat_map_url(self.flight.id), {"encoding": "png"})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_map_is_cached_until_next_booking(self):
+        self.client.get(seat_map_url(self.flight.id))
+        with self.assertNumQueries(1):
+            self.client.get(seat_map_url(self.flight.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("airport:order-list"),
+                {"tickets": [{"row": 3, "seat": 4, "flight": self.flight.id}]},
+                format="json",
+            )
+        result = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+
+        self.assertEqual(result.data["taken"], 4)
+        self.assertEqual(result.data["seats"][2], [3, 1])
+
+    def test_seat_map_written_after_a_booking_commit_is_not_served(self):
+        # A request that read the tickets before the booking committed
+        stale_key = seat_map_cache_key(self.flight.id)
+        stale_map = get_seat_map(self.flight)
+        cache.delete(stale_key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("airport:order-list"),
+                {"tickets": [{"row": 3, "seat": 4, "flight": self.flight.id}]},
+                format="json",
+            )
+        # ... stores its map only after the booking invalidated the old one
+        cache.set(stale_key, stale_map)
+        result = self.client.get(seat_map_url(self.flight.id))
+
+        self.assertEqual(result.data["taken"], 4)
+
+    def test_seat_map_follows_airplane_change(self):
+        self.client.get(seat_map_url(self.flight.id))
+        smaller = Airplane.objects.create(
+            name="small airplane",
+            airplane_type=self.airplane_type,
+            rows=2,
+            seats_in_row=2,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.airplane = smaller
+            self.flight.save()
+        result = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual((result.data["rows"], result.data["seats_in_row"]), (2, 2))
+        # Seats 2-3 and 2-4 do not exist on the smaller airplane
+        self.assertEqual(result.data["seats"], [[0, 1, 1], [2]])
+
+    def test_seat_map_follows_airplane_resize(self):
+        self.client.get(seat_map_url(self.flight.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airplane.rows = 5
+            self.airplane.save()
+        result = self.client.get(seat_map_url(self.flight.id))
+
+        self.assertEqual(result.data["rows"], 5)
+
+
+class FlightViewSetQueryCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_superuser(
+            email="admin@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        self.airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        self.crew = [
+            Crew.objects.create(first_name="John", last_name="Smith"),
+            Crew.objects.create(first_name="Anna", last_name="Jones"),
+        ]
+        self.flight = self.create_flight()
+        self.order = Order.objects.create(user=admin)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def create_flight(self):
+        flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time="2023-10-11 20:00+00:00",
+            arrival_time="2023-10-12 02:00+00:00",
+        )
+        flight.crew.set(self.crew)
+        return flight
+
+    def add_tickets(self, flight, rows):
+        for row in rows:
+            Ticket.objects.create(row=row, seat=1, flight=flight, order=self.order)
+
+    def payload(self):
+        return {
+            "route": self.route.id,
+            "airplane": self.airplane.id,
+            "departure_time": "2023-12-13 19:00",
+            "arrival_time": "2023-12-14 01:00",
+            "crew": [member.id for member in self.crew],
+        }
+
+    def test_list(self):
+        self.add_tickets(self.flight, range(1, 4))
+        for _ in range(5):
+            self.add_tickets(self.create_flight(), range(1, 4))
+
+        with self.assertNumQueries(1):
+            result = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(len(result.data["results"]), 6)
+
+    def test_retrieve(self):
+        with self.assertNumQueries(3):
+            self.client.get(detail_url(self.flight.id))
+
+        self.add_tickets(self.flight, range(1, 11))
+        self.flight.crew.add(Crew.objects.create(first_name="Mark", last_name="Lee"))
+        with self.assertNumQueries(3):
+            result = self.client.get(detail_url(self.flight.id))
+
+        self.assertEqual(len(result.data["crew"]), 3)
+        self.assertEqual(len(result.data["taken_places"]), 10)
+        self.assertEqual(result.data["airplane"]["airplane_type"], "Boing 777")
+
+    def test_create(self):
+        # route, airplane and every crew member are looked up on validation,
+        # then the flight and its crew links are inserted and crew re-read
+        with self.assertNumQueries(8):
+            result = self.client.post(FLIGHT_URL, self.payload())
+
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+
+    def test_update(self):
+        with self.assertNumQueries(8):
+            result = self.client.put(detail_url(self.flight.id), self.payload())
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+
+    def test_partial_update(self):
+        self.add_tickets(self.flight, range(1, 4))
+        with self.assertNumQueries(3):
+            result = self.client.patch(
+                detail_url(self.flight.id), {"departure_time": "2023-10-11 19:00"}
+            )
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+        self.assertCountEqual(result.data["crew"], [member.id for member in self.crew])
+
+    def test_destroy(self):
+        self.add_tickets(self.flight, range(1, 4))
+        # The cascaded tickets do not update the counter of the deleted flight,
+        # crew links, daily sales and tickets take one DELETE each
+        with self.assertNumQueries(6):
+            result = self.client.delete(detail_url(self.flight.id))
+
+        self.assertEqual(result.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Ticket.objects.filter(flight_id=self.flight.id).exists())
+
+    def test_seat_map(self):
+        with self.assertNumQueries(2):
+            self.client.get(seat_map_url(self.flight.id))
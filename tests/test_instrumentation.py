@@ -0,0 +1,121 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.instrumentation import metrics
+
+FLIGHT_URL = reverse("airport:flight-list")
+METRICS_URL = reverse("metrics")
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        self.user.is_staff = True
+        self.user.save()
+        result = self.client.get(FLIGHT_URL)
+
+        timing = dict(
+            (part.split(";")[0], part) for part in result["Server-Timing"].split(", ")
+        )
+        self.assertEqual(set(timing), {"db", "app", "render", "total"})
+        self.assertIn('desc="1 queries"', timing["db"])
+
+    def test_server_timing_header_is_staff_only(self):
+        result = self.client.get(FLIGHT_URL)
+
+        self.assertNotIn("Server-Timing", result)
+
+    def test_unavailable_cache_does_not_fail_the_request(self):
+        metrics.flushed_at = 0.0
+        with mock.patch(
+            "airport.instrumentation.cache.set", side_effect=ConnectionError
+        ), self.assertLogs("airport.requests", "WARNING"):
+            result = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+
+    def test_request_is_logged_as_json(self):
+        with self.assertLogs("airport.requests", "INFO") as logs:
+            self.client.get(FLIGHT_URL)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["endpoint"], "GET airport:flight-list")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], 1)
+        self.assertGreater(line["size"], 0)
+
+    def test_metrics_are_aggregated_per_endpoint(self):
+        for _ in range(3):
+            self.client.get(FLIGHT_URL)
+        admin = get_user_model().objects.create_superuser(
+            email="admin@email.com", password="password"
+        )
+        self.client.force_authenticate(admin)
+
+        result = self.client.get(METRICS_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data["workers"], 1)
+        flights = result.data["endpoints"]["GET airport:flight-list"]
+        self.assertEqual(flights["count"], 3)
+        self.assertEqual(flights["errors"], 0)
+        self.assertEqual(flights["queries"], {"p50": 1, "p95": 1, "p99": 1})
+        self.assertEqual(set(flights["latency_ms"]), {"p50", "p95", "p99"})
+        self.assertEqual(result.data["database"]["pool_mode"], "none")
+        self.assertEqual(result.data["database"]["requests"], 3)
+        self.assertIsNone(result.data["database"]["server"])
+
+    def test_opened_connections_are_counted(self):
+        connection_created.send(sender=connection.__class__, connection=connection)
+
+        self.assertEqual(metrics.snapshot()["connections_opened"], 1)
+
+    def test_metrics_are_staff_only(self):
+        result = self.client.get(METRICS_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_instrumentation_can_be_disabled(self):
+        result = self.client.get(FLIGHT_URL)
+
+        self.assertNotIn("Server-Timing", result)
+        self.assertEqual(metrics.snapshot()["endpoints"], {})
+
+
+class HealthCheckTest(TestCase):
+    def test_healthy(self):
+        result = APIClient().get(reverse("health"))
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data["status"], "ok")
+        self.assertEqual(result.data["database"]["status"], "ok")
+        self.assertEqual(result.data["cache"], {"status": "ok"})
+
+    def test_database_down(self):
+        with mock.patch(
+            "airport.views.check_database",
+            side_effect=OperationalError('connection to "db" as "admin" refused'),
+        ), self.assertLogs("airport.views", "ERROR"):
+            result = APIClient().get(reverse("health"))
+
+        self.assertEqual(result.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(result.data["database"], {"status": "error"})
+        self.assertNotIn("admin", result.content.decode())
@@ -0,0 +1,219 @@
+import heapq
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itineraries import RouteGraph, chain_flights
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+)
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+class RouteGraphTest(TestCase):
+    def test_shortest_paths_are_ordered_by_distance_and_hop_limited(self):
+        graph = RouteGraph(
+            [
+                (1, "A", "B", 500),
+                (2, "B", "C", 400),
+                (3, "A", "C", 1000),
+                (4, "C", "D", 300),
+                (5, "B", "D", 900),
+            ]
+        )
+
+        self.assertEqual(
+            graph.shortest_paths("A", "C", max_legs=2, limit=5),
+            [(900, [1, 2]), (1000, [3])],
+        )
+        self.assertEqual(graph.shortest_paths("A", "D", max_legs=1, limit=5), [])
+
+        graph.remove(2)
+        self.assertEqual(
+            graph.shortest_paths("A", "C", max_legs=2, limit=5), [(1000, [3])]
+        )
+
+    def test_origin_is_not_a_path_to_itself(self):
+        graph = RouteGraph([(1, "A", "B", 500), (2, "B", "A", 500)])
+
+        self.assertEqual(graph.shortest_paths("A", "A", max_legs=2, limit=5), [])
+
+    def test_patching_replaces_routes_of_the_source_airport(self):
+        graph = RouteGraph([(1, "A", "B", 500), (3, "B", "C", 200)])
+        routes_of_a, routes_of_b = graph.edges["A"], graph.edges["B"]
+        graph.add(2, "A", "C", 300)
+        graph.remove(1)
+
+        self.assertEqual(routes_of_a, {1: ("B", 500)})
+        self.assertEqual(graph.edges["A"], {2: ("C", 300)})
+        self.assertIs(graph.edges["B"], routes_of_b)
+
+
+class ChainFlightsTest(SimpleTestCase):
+    def flights(self, first_departure, count, minutes):
+        return [
+            SimpleNamespace(
+                departure_time=first_departure + timedelta(minutes=15 * i),
+                arrival_time=first_departure + timedelta(minutes=15 * i + minutes),
+            )
+            for i in range(count)
+        ]
+
+    def test_work_is_bounded_with_many_flights_per_leg(self):
+        day_start = datetime(2023, 10, 11, tzinfo=timezone.utc)
+        flights_by_route = {
+            1: self.flights(day_start, 60, 60),
+            2: self.flights(day_start + timedelta(hours=1), 60, 50),
+            3: self.flights(day_start + timedelta(hours=2), 60, 40),
+        }
+        all_chains = chain_flights(
+            [(900, [1, 2, 3])], flights_by_route, day_start + timedelta(days=1), 10**6
+        )
+
+        with mock.patch(
+            "airport.itineraries.heapq.heappush", wraps=heapq.heappush
+        ) as heappush:
+            chains = chain_flights(
+                [(900, [1, 2, 3])],
+                flights_by_route,
+                day_start + timedelta(days=1),
+                limit=5,
+            )
+
+        def duration(chain):
+            return chain[-1].arrival_time - chain[0].departure_time
+
+        self.assertEqual(len(chains), 5)
+        self.assertEqual(
+            [duration(chain) for _, chain in chains],
+            sorted(duration(chain) for _, chain in all_chains)[:5],
+        )
+        self.assertLess(heappush.call_count, 100)
+
+
+class ItineraryApiTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country = Country.objects.create(name="Ukraine")
+        city = City.objects.create(name="Kyiv", country=country)
+        self.kyiv, self.lviv, self.warsaw = (
+            Airport.objects.create(name=name, closest_big_city=city)
+            for name in ("Kyiv", "Lviv", "Warsaw")
+        )
+        self.direct = Route.objects.create(
+            source=self.kyiv, destination=self.warsaw, distance=800
+        )
+        self.first_leg = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=470
+        )
+        self.second_leg = Route.objects.create(
+            source=self.lviv, destination=self.warsaw, distance=330
+        )
+        airplane_type = AirplaneType.objects.create(name="Boeing 737")
+        self.airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        self.direct_flight = self.create_flight(self.direct, "10:00", "13:00")
+        self.first_flight = self.create_flight(self.first_leg, "08:00", "09:00")
+        # 30 minutes is below the minimum connection time
+        self.create_flight(self.second_leg, "09:30", "10:30")
+        self.connection = self.create_flight(self.second_leg, "10:00", "10:50")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def create_flight(self, route, departure, arrival):
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=f"2023-10-11 {departure}+00:00",
+            arrival_time=f"2023-10-11 {arrival}+00:00",
+        )
+
+    def search(self, **params):
+        params = {
+            "from": self.kyiv.id,
+            "to": self.warsaw.id,
+            "date": "2023-10-11",
+            **params,
+        }
+        return self.client.get(ITINERARY_URL, params)
+
+    def test_connecting_and_direct_itineraries(self):
+        result = self.search()
+        flight_ids = [
+            [flight["id"] for flight in itinerary["flights"]]
+            for itinerary in result.data
+        ]
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            flight_ids,
+            [[self.first_flight.id, self.connection.id], [self.direct_flight.id]],
+        )
+        self.assertEqual(result.data[0]["stops"], 1)
+        self.assertEqual(result.data[0]["duration_minutes"], 170)
+        self.assertEqual(result.data[0]["distance"], 800)
+
+    def test_max_stops_zero_returns_direct_flights_only(self):
+        result = self.search(max_stops=0)
+
+        self.assertEqual(len(result.data), 1)
+        self.assertEqual(result.data[0]["flights"][0]["id"], self.direct_flight.id)
+
+    def test_other_date_has_no_itineraries(self):
+        self.assertEqual(self.search(date="2023-10-12").data, [])
+
+    def test_new_route_is_added_to_built_graph(self):
+        self.search()
+        gdansk = Airport.objects.create(
+            name="Gdansk", closest_big_city=self.kyiv.closest_big_city
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            route = Route.objects.create(
+                source=self.warsaw, destination=gdansk, distance=300
+            )
+        self.create_flight(route, "14:00", "15:00")
+
+        one_stop = self.search(to=gdansk.id)
+        two_stops = self.search(to=gdansk.id, max_stops=2)
+
+        self.assertEqual(len(one_stop.data), 1)
+        self.assertEqual(one_stop.data[0]["stops"], 1)
+        self.assertEqual(len(two_stops.data), 2)
+
+    def test_rolled_back_route_delete_keeps_graph(self):
+        self.search()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.direct.delete()
+                raise RuntimeError
+
+        self.assertEqual(len(self.search(max_stops=0).data), 1)
+
+    def test_invalid_params(self):
+        result = self.client.get(ITINERARY_URL, {"from": "x", "max_stops": 9})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(result.data), {"from", "to", "max_stops"})
+
+    def test_same_departure_and_arrival_airport(self):
+        result = self.search(to=self.kyiv.id)
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(result.data), {"to"})
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -80,7 +82,7 @@ class AuthorizedUserOrderViewSetTest(TestCase):
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
         self.assertEqual(orders.count(), 1)
-        self.assertEqual(result.data, serializer.data)
+        self.assertEqual(result.data["results"], serializer.data)
 
     def test_get_order_list_if_not_owner(self):
         owner = get_user_model().objects.get(pk=1)
@@ -91,7 +93,39 @@ class AuthorizedUserOrderViewSetTest(TestCase):
         orders = Order.objects.filter(user=owner)
         serializer = OrderListSerializer(orders, many=True)
 
-        self.assertNotEqual(result.data, serializer.data)
+        self.assertNotEqual(result.data["results"], serializer.data)
+
+    def test_get_order_list_query_count_does_not_grow_with_tickets(self):
+        owner = get_user_model().objects.get(pk=1)
+        flight = Flight.objects.get(pk=1)
+        with self.assertNumQueries(2):
+            result = self.client.get(ORDER_URL)
+        self.assertEqual(
+            result.data["results"][0]["tickets"][0]["flight"]["tickets_available"], 188
+        )
+
+        airport = Airport.objects.create(
+            name="Airport 3", closest_big_city=City.objects.get(pk=1)
+        )
+        route = Route.objects.create(
+            source=airport, destination=flight.route.source, distance=100
+        )
+        other_flight = Flight.objects.create(
+            route=route,
+            airplane=flight.airplane,
+            departure_time="2023-10-13 20:00",
+            arrival_time="2023-10-13 22:00",
+        )
+        for row in range(1, 11):
+            order = Order.objects.create(user=owner)
+            Ticket.objects.create(row=row, seat=1, flight=flight, order=order)
+            Ticket.objects.create(row=row, seat=2, flight=other_flight, order=order)
+
+        with self.assertNumQueries(2):
+            result = self.client.get(ORDER_URL)
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(result.data["results"]), 11)
 
     def test_retrieve_order(self):
         order = Order.objects.get(pk=1)
@@ -133,6 +167,60 @@ class AuthorizedUserOrderViewSetTest(TestCase):
         self.assertEqual(ticket_data["seat"], ticket.seat)
         self.assertEqual(order.tickets.all()[0], ticket)
 
+    def test_create_order_rejects_duplicated_seats(self):
+        tickets = [
+            {"row": 1, "seat": 1, "flight": 1},
+            {"row": 1, "seat": 1, "flight": 1},
+        ]
+
+        result = self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            result.data["tickets"],
+            ["Row 1, seat 1 on flight 1 is requested more than once"],
+        )
+
+    def test_create_order_with_taken_seat_conflicts(self):
+        tickets = [
+            {"row": 20, "seat": 4, "flight": 1},
+            {"row": 1, "seat": 1, "flight": 1},
+        ]
+
+        result = self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+        self.assertEqual(result.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            result.data["conflicts"], [{"flight": 1, "row": 20, "seat": 4}]
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_order_rejects_seat_out_of_range(self):
+        tickets = [{"row": 39, "seat": 1, "flight": 1}]
+
+        result = self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", result.data["tickets"][0])
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        def book(seats):
+            tickets = [{"row": row, "seat": 1, "flight": 1} for row in seats]
+            with CaptureQueriesContext(connection) as queries:
+                result = self.client.post(
+                    ORDER_URL, {"tickets": tickets}, format="json"
+                )
+            self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        single_seat = book([1])
+        group = book(range(2, 11))
+        flight = Flight.objects.get(pk=1)
+
+        self.assertEqual(single_seat, group)
+        self.assertEqual(flight.tickets_sold, 12)
+
     def test_update_order_not_allowed(self):
         order = Order.objects.get(pk=1)
         url = detail_url(order.id)
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Country, City
+
+CITY_URL = reverse("airport:city-list")
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.country = Country.objects.create(name="Germany")
+        self.city = City.objects.create(name="Berlin", country=self.country)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.client.get(CITY_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(CITY_URL)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_write_invalidates_cached_responses(self):
+        self.client.get(CITY_URL)
+        self.client.get(reverse("airport:city-detail", args=[self.city.id]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.country.name = "Deutschland"
+            self.country.save()
+            City.objects.create(name="Munich", country=self.country)
+        result = self.client.get(CITY_URL)
+        detail = self.client.get(reverse("airport:city-detail", args=[self.city.id]))
+
+        self.assertEqual(len(result.data["results"]), 2)
+        self.assertEqual(detail.data["country"], "Deutschland")
+
+    def test_rolled_back_write_keeps_cached_responses(self):
+        self.client.get(CITY_URL)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                City.objects.create(name="Munich", country=self.country)
+                raise RuntimeError
+
+        with self.assertNumQueries(0):
+            self.client.get(CITY_URL)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(CITY_URL)["ETag"]
+
+        not_modified = self.client.get(CITY_URL, HTTP_IF_NONE_MATCH=etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            City.objects.create(name="Munich", country=self.country)
+        modified = self.client.get(CITY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified["ETag"], etag)
+
+    def test_error_responses_are_not_cached(self):
+        missing_url = reverse("airport:city-detail", args=[999])
+
+        self.assertEqual(self.client.get(missing_url).status_code, 404)
+        City.objects.create(id=999, name="Munich", country=self.country)
+        self.assertEqual(self.client.get(missing_url).status_code, 200)
@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from airport.models import Airport, Country, City, Route
+from airport.search import reset_ngram_indexes
 from airport.serializers import (
     RouteSerializer,
     RouteListSerializer,
@@ -43,6 +45,8 @@ class UnauthorizedRouteViewSetTest(TestCase):
 
 class AuthorizedUserRouteViewSetTest(TestCase):
     def setUp(self):
+        cache.clear()
+        reset_ngram_indexes()
         user = get_user_model().objects.create_user(
             email="test@email.com", password="password"
         )
@@ -69,7 +73,7 @@ class AuthorizedUserRouteViewSetTest(TestCase):
         serializer = RouteListSerializer(routs, many=True)
 
         self.assertEqual(result.status_code, status.HTTP_200_OK)
-        self.assertEqual(result.data, serializer.data)
+        self.assertEqual(result.data["results"], serializer.data)
         self.assertEqual(routs.count(), 2)
 
     def test_retrieve_route(self):
@@ -87,7 +91,7 @@ class AuthorizedUserRouteViewSetTest(TestCase):
         result = self.client.get(ROUTE_URL, {"source": f"Airport 1"})
         serializer = RouteListSerializer(route_1)
 
-        self.assertIn(serializer.data, result.data)
+        self.assertIn(serializer.data, result.data["results"])
 
     def test_get_routes_filtered_by_destination(self):
         route_1 = Route.objects.get(pk=1)
@@ -96,7 +100,26 @@ class AuthorizedUserRouteViewSetTest(TestCase):
         result = self.client.get(ROUTE_URL, {"destination": f"Airport 2"})
         serializer = RouteListSerializer([route_1, route_2], many=True)
 
-        self.assertEqual(serializer.data, result.data)
+        self.assertEqual(serializer.data, result.data["results"])
+
+    def test_autocomplete_routes(self):
+        result = self.client.get(
+            reverse("airport:route-autocomplete"), {"q": "Airport 3"}
+        )
+        serializer = RouteDetailSerializer([Route.objects.get(pk=2)], many=True)
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data[0], serializer.data[0])
+
+    def test_get_routes_filtered_by_source_and_destination(self):
+        route_2 = Route.objects.get(pk=2)
+
+        result = self.client.get(
+            ROUTE_URL, {"source": "Airport 3", "destination": "Airport 2"}
+        )
+        serializer = RouteListSerializer([route_2], many=True)
+
+        self.assertEqual(serializer.data, result.data["results"])
 
     def test_create_route_forbidden(self):
         source = Airport.objects.get(pk=1)
@@ -128,6 +151,7 @@ class AuthorizedUserRouteViewSetTest(TestCase):
 
 class AdminRouteViewSetTest(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         admin = get_user_model().objects.create_superuser(
             email="test@email.com", password="password"
         )
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Crew,
+)
+from airport.schedule_import import import_schedule
+
+IMPORT_URL = reverse("airport:flight-import-schedule")
+
+CSV_SCHEDULE = """route,source,destination,airplane,departure_time,arrival_time,crew
+1,,,1,2024-06-01T08:00,2024-06-01T10:00,1 2
+,Airport 2,Airport 1,test airplane,2024-06-01T12:00+02:00,2024-06-01T14:00+02:00,
+9,,,1,2024-06-02T08:00,2024-06-02T10:00,
+1,,,7,2024-06-02T08:00,yesterday,3
+1,,,1,2024-06-03T08:00,2024-06-03T07:00,2
+"""
+
+
+def upload(content, name):
+    return SimpleUploadedFile(name, content.encode(), content_type="text/plain")
+
+
+class ScheduleImportTest(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        airport_1 = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        airport_2 = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        Route.objects.create(source=airport_1, destination=airport_2, distance=590)
+        Route.objects.create(source=airport_2, destination=airport_1, distance=590)
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        Crew.objects.create(first_name="John", last_name="Smith")
+        Crew.objects.create(first_name="Anna", last_name="Jones")
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_import_csv_reports_invalid_rows(self):
+        result = self.client.post(
+            IMPORT_URL, {"file": upload(CSV_SCHEDULE, "summer.csv")}
+        )
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.data["created"], 2)
+        self.assertEqual(
+            result.data["errors"],
+            [
+                {"line": 4, "errors": {"route": "Unknown route 9"}},
+                {
+                    "line": 5,
+                    "errors": {
+                        "airplane": "Unknown airplane 7",
+                        "arrival_time": "Enter a valid datetime (ex. 2023-10-11T20:00)",
+                        "crew": "Unknown crew [3]",
+                    },
+                },
+                {
+                    "line": 6,
+                    "errors": {
+                        "arrival_time": "arrival time can not be less than departure time"
+                    },
+                },
+            ],
+        )
+        first, second = Flight.objects.order_by("id")
+        self.assertEqual(sorted(first.crew.values_list("id", flat=True)), [1, 2])
+        self.assertEqual(second.route_id, 2)
+        self.assertEqual(second.departure_time.hour, 10)
+
+    def test_import_ndjson(self):
+        lines = [
+            json.dumps(
+                {
+                    "route": 2,
+                    "airplane": 1,
+                    "departure_time": "2024-06-01T08:00",
+                    "arrival_time": "2024-06-01T10:00",
+                    "crew": [2],
+                }
+            ),
+            "",
+            "not json",
+        ]
+        result = self.client.post(
+            IMPORT_URL, {"file": upload("\n".join(lines), "schedule.ndjson")}
+        )
+
+        self.assertEqual(result.data["created"], 1)
+        self.assertEqual(
+            result.data["errors"],
+            [{"line": 3, "errors": {"row": "Not a valid JSON object"}}],
+        )
+        self.assertEqual(Flight.objects.get().crew.get().id, 2)
+
+    def test_import_requires_known_format(self):
+        result = self.client.post(IMPORT_URL, {"file": upload("", "schedule.xlsx")})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_refuses_file_that_is_not_utf8(self):
+        content = (
+            CSV_SCHEDULE.encode()
+            + "1,,,1,2024-06-04T08:00,2024-06-04T10:00,Müller\n".encode("latin-1")
+        )
+        file = SimpleUploadedFile("summer.csv", content, content_type="text/plain")
+
+        result = self.client.post(IMPORT_URL, {"file": file})
+
+        self.assertEqual(result.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("not UTF-8", result.data["file"])
+        self.assertFalse(Flight.objects.exists())
+
+    def test_csv_syntax_error_is_reported_as_row_error(self):
+        content = CSV_SCHEDULE.splitlines()[0] + "\n"
+        content += "1,,,1,2024-06-01T08:00,2024-06-01T10:00,\n"
+        content += "1,,,1," + "x" * (csv.field_size_limit() + 1) + ",,\n"
+
+        report = import_schedule(io.BytesIO(content.encode()), "csv")
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["errors"][0]["line"], 3)
+        self.assertIn("Invalid CSV", report["errors"][0]["errors"]["row"])
+
+    def test_import_is_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.client.force_authenticate(user)
+
+        result = self.client.post(IMPORT_URL, {"file": upload(CSV_SCHEDULE, "a.csv")})
+
+        self.assertEqual(result.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_flights_are_inserted_in_chunks(self):
+        rows = "\n".join(
+            json.dumps(
+                {
+                    "route": 1,
+                    "airplane": 1,
+                    "departure_time": f"2024-06-{day:02}T08:00",
+                    "arrival_time": f"2024-06-{day:02}T10:00",
+                    "crew": [1, 2],
+                }
+            )
+            for day in range(1, 11)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            report = import_schedule(io.BytesIO(rows.encode()), "ndjson", chunk_size=3)
+        statements = [query["sql"].split()[0] for query in queries]
+
+        # Three lookup queries, then a flight and a crew insert per chunk
+        self.assertEqual(statements.count("SELECT"), 3)
+        self.assertEqual(statements.count("INSERT"), 2 * 4)
+        self.assertEqual(report, {"created": 10, "errors": []})
+        self.assertEqual(Flight.crew.through.objects.count(), 20)
+
+    def test_import_schedule_command(self):
+        out, err = io.StringIO(), io.StringIO()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(CSV_SCHEDULE)
+            file.flush()
+            call_command("import_schedule", file.name, stdout=out, stderr=err)
+
+        self.assertIn("Imported 2 flight(s), skipped 3 invalid row(s)", out.getvalue())
+        self.assertIn("Line 4: route: Unknown route 9", err.getvalue())
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from airport.search import NgramIndex, trigrams
+
+
+class NgramIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = NgramIndex(
+            [
+                (1, "London Heathrow Airport"),
+                (2, "London Gatwick Airport"),
+                (3, "Heraklion International"),
+                (4, "Kyiv Boryspil"),
+            ]
+        )
+
+    def test_trigrams_are_padded_per_word(self):
+        self.assertEqual(trigrams("Kyiv"), {"  k", " ky", "kyi", "yiv", "iv "})
+
+    def test_search_ranks_best_match_first(self):
+        result = self.index.search("heathrow", threshold=0.6, limit=10)
+
+        self.assertEqual([pk for pk, _ in result], [1])
+
+    def test_search_matches_prefix_of_word(self):
+        result = self.index.search("london", threshold=0.6, limit=10)
+
+        self.assertEqual([pk for pk, _ in result], [2, 1])
+
+    def test_search_tolerates_typos(self):
+        result = self.index.search("boryspol", threshold=0.6, limit=10)
+
+        self.assertEqual([pk for pk, _ in result], [4])
+
+    def test_removed_entries_are_not_found(self):
+        self.index.remove(1)
+        self.index.add(2, "Stansted")
+
+        self.assertEqual(self.index.search("london", threshold=0.6, limit=10), [])
@@ -0,0 +1,90 @@
+import io
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from airport.models import Airport, Flight, Order, Route, SeedRecord, Ticket
+from airport.seeding import generate, load_fixture
+
+FIXTURE = settings.BASE_DIR / "airport_api_service_fixture.json"
+
+
+class LoadFixtureTest(TestCase):
+    def test_load_fixture(self):
+        counts = load_fixture(FIXTURE, users=True)
+
+        self.assertEqual(counts["airport.flight"], 4)
+        self.assertEqual(counts["airport.ticket"], 8)
+        self.assertEqual(counts["user.user"], 4)
+        self.assertNotIn("admin.logentry", counts)
+        admin = get_user_model().objects.get(email="admin@admin.com")
+        self.assertTrue(admin.check_password("qay12345"))
+        self.assertEqual(
+            Order.objects.get(pk=1).created_at.isoformat(),
+            "2023-07-24T20:24:15.823000+00:00",
+        )
+        self.assertEqual(
+            sorted(Flight.objects.get(pk=1).crew.values_list("id", flat=True)),
+            [1, 3, 8],
+        )
+        for flight in Flight.objects.annotate(sold=Count("tickets")):
+            self.assertEqual(flight.tickets_sold, flight.sold)
+
+    def test_fixture_users_are_skipped_by_default(self):
+        counts = load_fixture(FIXTURE)
+
+        self.assertEqual(counts["airport.flight"], 4)
+        self.assertNotIn("user.user", counts)
+        self.assertNotIn("airport.order", counts)
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+        self.assertIsNotNone(load_fixture(FIXTURE, users=True))
+
+    def test_same_fixture_is_skipped(self):
+        load_fixture(FIXTURE)
+        with self.assertNumQueries(1):
+            self.assertIsNone(load_fixture(FIXTURE))
+
+    def test_forced_load_keeps_existing_rows(self):
+        load_fixture(FIXTURE)
+        Airport.objects.filter(pk=1).update(name="Renamed")
+
+        counts = load_fixture(FIXTURE, force=True)
+
+        self.assertEqual(sum(counts.values()), 0)
+        self.assertEqual(Airport.objects.get(pk=1).name, "Renamed")
+        self.assertEqual(SeedRecord.objects.count(), 1)
+
+
+class GenerateTest(TestCase):
+    def test_generate_synthetic_data(self):
+        counts = generate(airports=20, routes=40, flights=30, tickets=500, seed=3)
+
+        self.assertEqual(counts["airport.airport"], 20)
+        self.assertEqual(Route.objects.count(), 40)
+        self.assertEqual(Flight.objects.count(), 30)
+        self.assertEqual(Ticket.objects.count(), 500)
+        self.assertFalse(Route.objects.filter(source_id=F("destination_id")))
+        for flight in Flight.objects.annotate(sold=Count("tickets")):
+            self.assertEqual(flight.tickets_sold, flight.sold)
+            self.assertLess(flight.departure_time, flight.arrival_time)
+
+    def test_same_data_set_is_generated_once(self):
+        generate(airports=5, routes=5, flights=5, tickets=10)
+
+        self.assertIsNone(generate(airports=5, routes=5, flights=5, tickets=10))
+        self.assertIsNotNone(generate(airports=5, routes=5, flights=5, tickets=20))
+        self.assertEqual(Flight.objects.count(), 10)
+
+    def test_seed_command(self):
+        out = io.StringIO()
+        call_command("seed", "--flights", "10", "--airports", "5", stdout=out)
+        call_command("seed", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("airport.flight: 4", output)
+        self.assertIn("airport.flight: 10", output)
+        self.assertIn("unchanged since the last load, skipped", output)
@@ -0,0 +1,92 @@
+import importlib
+import io
+import os
+import runpy
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.urls import reverse
+
+
+def load_production_settings(**env):
+    env.setdefault("REDIS_CACHE_URL", "redis://redis:6379/1")
+    with mock.patch.dict(os.environ, env):
+        module = importlib.import_module("sky-journey-api.settings_production")
+        return importlib.reload(module)
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def test_debug_tooling_is_stripped(self):
+        production = load_production_settings()
+
+        self.assertFalse(production.DEBUG)
+        self.assertNotIn("debug_toolbar", production.INSTALLED_APPS)
+        self.assertNotIn(
+            "debug_toolbar.middleware.DebugToolbarMiddleware", production.MIDDLEWARE
+        )
+
+    def test_forwarded_proto_is_not_trusted_by_default(self):
+        production = load_production_settings()
+
+        self.assertIsNone(production.SECURE_PROXY_SSL_HEADER)
+
+    def test_shared_cache_is_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_production_settings(REDIS_CACHE_URL="")
+
+    def test_database_pool_modes(self):
+        production = load_production_settings()
+
+        self.assertEqual(production.database_settings("none")["CONN_MAX_AGE"], 0)
+        persistent = production.database_settings("persistent")
+        self.assertGreater(persistent["CONN_MAX_AGE"], 0)
+        self.assertTrue(persistent["CONN_HEALTH_CHECKS"])
+        self.assertEqual(
+            production.database_settings("persistent", asgi=True)["CONN_MAX_AGE"], 0
+        )
+        pgbouncer = production.database_settings("pgbouncer")
+        self.assertEqual(pgbouncer["PORT"], "6432")
+        self.assertTrue(pgbouncer["DISABLE_SERVER_SIDE_CURSORS"])
+        with self.assertRaises(ValueError):
+            production.database_settings("pool")
+
+
+class GunicornConfigTest(SimpleTestCase):
+    def load_config(self, **env):
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop("WEB_CONCURRENCY", None)
+            return runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+
+    def test_workers_stay_within_connection_budget(self):
+        config = self.load_config(
+            DB_POOL_MODE="persistent", DB_CONNECTION_BUDGET="8", GUNICORN_THREADS="4"
+        )
+
+        self.assertLessEqual(config["workers"] * config["threads"], 8)
+        self.assertGreaterEqual(config["workers"], 1)
+
+    def test_pgbouncer_workers_follow_cpus(self):
+        config = self.load_config(DB_POOL_MODE="pgbouncer", DB_CONNECTION_BUDGET="1")
+
+        self.assertEqual(config["workers"], config["available_cpus"]() * 2 + 1)
+
+
+class HttpLoadTestCommandTest(LiveServerTestCase):
+    def test_reports_throughput_and_status_codes(self):
+        out = io.StringIO()
+
+        call_command(
+            "http_load_test",
+            self.live_server_url + reverse("airport:flight-list"),
+            requests=6,
+            concurrency=2,
+            stdout=out,
+        )
+
+        self.assertIn("Requests: 6", out.getvalue())
+        self.assertIn("Throughput:", out.getvalue())
+        # Anonymous requests are rejected by the default permissions
+        self.assertIn("401: 6", out.getvalue())
@@ -0,0 +1,143 @@
+import os
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.throttling import (
+    LocalThrottleStore,
+    RedisThrottleStore,
+    get_store,
+    retry_after,
+)
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# The script tests need a disposable Redis, ex. TEST_REDIS_URL=redis://localhost:6379/15
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+ORDER_URL = reverse("airport:order-list")
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+
+
+def rates(**scopes):
+    return {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+            **scopes,
+        },
+    }
+
+
+class SlidingWindowTest(SimpleTestCase):
+    def test_previous_window_counts_by_its_overlap(self):
+        store = LocalThrottleStore()
+        hits = [store.hit("k:0", "k:1", 3, 60, 10)[0] for _ in range(4)]
+
+        self.assertEqual(hits, [True, True, True, False])
+        # Half of the previous window still overlaps: 3 * 0.5 + 1 <= 3
+        self.assertEqual(store.hit("k:1", "k:2", 3, 60, 30), (True, 3, 1))
+        self.assertEqual(store.hit("k:1", "k:2", 3, 60, 30), (False, 3, 1))
+
+    def test_retry_after(self):
+        # Room once the previous window's weight fell to a third
+        self.assertAlmostEqual(retry_after(3, 1, 3, 60, 30), 10)
+        # The current window is full, wait for the next one
+        self.assertAlmostEqual(retry_after(0, 3, 3, 60, 10), 50 + 20)
+
+
+# Hits as (previous window, current window, limit, duration, elapsed)
+HIT_SEQUENCE = (
+    [("k:0", "k:1", 3, 60, 10)] * 4
+    + [("k:1", "k:2", 3, 60, 30)] * 2
+    + [("k:1", "k:2", 3, 60, 50)] * 2
+    + [("k:2", "k:3", 5, 60, 0)] * 2
+)
+
+
+@unittest.skipUnless(redis and TEST_REDIS_URL, "set TEST_REDIS_URL to run")
+class RedisSlidingWindowScriptTest(SimpleTestCase):
+    def setUp(self):
+        self.redis = redis.Redis.from_url(TEST_REDIS_URL)
+        try:
+            self.redis.flushdb()
+        except redis.RedisError as error:
+            self.skipTest(f"Redis unavailable: {error}")
+        self.addCleanup(self.redis.flushdb)
+
+    def test_script_matches_local_store(self):
+        store = RedisThrottleStore(TEST_REDIS_URL)
+        local = LocalThrottleStore()
+
+        for hit in HIT_SEQUENCE:
+            self.assertEqual(store.hit(*hit), local.hit(*hit), hit)
+
+    def test_current_window_expires_after_two_durations(self):
+        RedisThrottleStore(TEST_REDIS_URL).hit("k:0", "k:1", 3, 60, 10)
+
+        self.assertEqual(self.redis.ttl("k:1"), 120)
+        self.assertFalse(self.redis.exists("k:0"))
+
+
+@unittest.skipUnless(redis, "the redis package is not installed")
+class RedisThrottleStoreTest(SimpleTestCase):
+    def test_unavailable_store_allows_the_request(self):
+        store = RedisThrottleStore("redis://localhost:1/0")
+
+        with self.assertLogs("airport.throttling", "WARNING"):
+            result = store.hit("k:0", "k:1", 1, 60, 10)
+
+        self.assertEqual(result, (True, 0, 0))
+
+    def test_script_result_is_converted(self):
+        store = RedisThrottleStore("redis://localhost:1/0")
+
+        with mock.patch.object(store, "script", return_value=[0, b"3", 1]):
+            self.assertEqual(store.hit("k:0", "k:1", 3, 60, 10), (False, 3, 1))
+
+
+class ThrottleScopeTest(TestCase):
+    def setUp(self):
+        get_store().reset()
+        user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    @override_settings(REST_FRAMEWORK=rates(booking="2/minute"))
+    def test_booking_scope_limits_order_creation_only(self):
+        codes = [
+            self.client.post(ORDER_URL, {"tickets": []}, format="json").status_code
+            for _ in range(3)
+        ]
+        result = self.client.post(ORDER_URL, {"tickets": []}, format="json")
+
+        self.assertEqual(codes[:2], [status.HTTP_400_BAD_REQUEST] * 2)
+        self.assertEqual(codes[2], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(result["Retry-After"]), 0)
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
+
+    @override_settings(REST_FRAMEWORK=rates(search="1/minute"))
+    def test_search_scope(self):
+        first = self.client.get(AUTOCOMPLETE_URL, {"q": "ber"})
+        second = self.client.get(AUTOCOMPLETE_URL, {"q": "ber"})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=rates(search="1/minute"), THROTTLE_ENABLED=False)
+    def test_throttling_can_be_disabled(self):
+        for _ in range(3):
+            result = self.client.get(AUTOCOMPLETE_URL, {"q": "ber"})
+
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
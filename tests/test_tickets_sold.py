@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Ticket,
+    Order,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class TicketsSoldCounterTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country = Country.objects.create(name="Germany")
+        city = City.objects.create(name="Berlin", country=country)
+        source = Airport.objects.create(name="Airport 1", closest_big_city=city)
+        destination = Airport.objects.create(name="Airport 2", closest_big_city=city)
+        route = Route.objects.create(
+            source=source, destination=destination, distance=590
+        )
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2023-10-11 20:00+00:00",
+            arrival_time="2023-10-12 02:00+00:00",
+        )
+        self.other_flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2023-10-12 20:00+00:00",
+            arrival_time="2023-10-13 02:00+00:00",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_order_create_increments_counter(self):
+        tickets = [
+            {"row": 1, "seat": 1, "flight": self.flight.id},
+            {"row": 1, "seat": 2, "flight": self.flight.id},
+        ]
+        result = self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(result.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flight.tickets_sold, 2)
+        self.assertEqual(self.flight.tickets_available, 38)
+
+    def test_ticket_and_order_deletion_decrement_counter(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        Ticket.objects.create(row=1, seat=3, flight=self.flight, order=order)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+        order.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_moving_ticket_moves_counter(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        ticket.flight = self.other_flight
+        ticket.save()
+        ticket.seat = 2
+        ticket.save()
+        self.flight.refresh_from_db()
+        self.other_flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_sold, 0)
+        self.assertEqual(self.other_flight.tickets_sold, 1)
+
+    def test_flight_list_reports_tickets_available(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        result = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(result.data["results"][0]["tickets_available"], 39)
+
+    def test_sync_tickets_sold_command(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_sold=7)
+
+        with self.assertRaises(CommandError):
+            call_command("sync_tickets_sold", "--check", stdout=StringIO())
+
+        call_command("sync_tickets_sold", stdout=StringIO())
+        call_command("sync_tickets_sold", "--check", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
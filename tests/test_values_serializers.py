@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airport,
+    Country,
+    City,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Ticket,
+    Order,
+)
+from airport.serializers import (
+    CityListSerializer,
+    RouteListSerializer,
+    FlightListSerializer,
+    TicketListSerializer,
+    OrderListSerializer,
+)
+from airport.values_serializers import (
+    CityValuesSerializer,
+    RouteValuesSerializer,
+    FlightValuesSerializer,
+    TicketValuesSerializer,
+    OrderValuesSerializer,
+)
+
+
+class ValuesSerializerParityTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com", password="password"
+        )
+        country_1 = Country.objects.create(name="Germany")
+        country_2 = Country.objects.create(name="France")
+        city_1 = City.objects.create(name="Berlin", country=country_1)
+        city_2 = City.objects.create(name="Paris", country=country_2)
+        berlin = Airport.objects.create(name="Berlin Airport", closest_big_city=city_1)
+        paris = Airport.objects.create(name="Paris Airport", closest_big_city=city_2)
+        route_1 = Route.objects.create(source=berlin, destination=paris, distance=880)
+        route_2 = Route.objects.create(source=paris, destination=berlin, distance=880)
+        airplane_type = AirplaneType.objects.create(name="Boing 777")
+        airplane = Airplane.objects.create(
+            name="test airplane", airplane_type=airplane_type, rows=10, seats_in_row=4
+        )
+        flight_1 = Flight.objects.create(
+            route=route_1,
+            airplane=airplane,
+            departure_time=datetime(2023, 10, 11, 20, 0, tzinfo=timezone.utc),
+            arrival_time=datetime(2023, 10, 11, 21, 45, 30, 120, tzinfo=timezone.utc),
+        )
+        flight_2 = Flight.objects.create(
+            route=route_2,
+            airplane=airplane,
+            departure_time=datetime(2023, 10, 12, 8, 5, tzinfo=timezone.utc),
+            arrival_time=datetime(2023, 10, 12, 9, 50, tzinfo=timezone.utc),
+        )
+        for row in range(1, 4):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(row=row, seat=1, flight=flight_1, order=order)
+            Ticket.objects.create(row=row, seat=2, flight=flight_2, order=order)
+        Order.objects.create(user=self.user)
+
+    def assert_same_output(self, queryset, serializer_class, values_serializer_class):
+        values_serializer = values_serializer_class()
+        expected = serializer_class(queryset, many=True).data
+        actual = values_serializer.represent(values_serializer.get_rows(queryset))
+
+        self.assertEqual(len(actual), len(expected))
+        for expected_item, actual_item in zip(expected, actual):
+            self.assertEqual(list(actual_item), list(expected_item))
+            for field, value in expected_item.items():
+                self.assertEqual(actual_item[field], value, field)
+
+    def test_city(self):
+        self.assert_same_output(
+            City.objects.select_related("country"),
+            CityListSerializer,
+            CityValuesSerializer,
+        )
+
+    def test_route(self):
+        self.assert_same_output(
+            Route.objects.select_related("source", "destination"),
+            RouteListSerializer,
+            RouteValuesSerializer,
+        )
+
+    def test_flight(self):
+        self.assert_same_output(
+            Flight.objects.select_related(
+                "route__source", "route__destination", "airplane"
+            ),
+            FlightListSerializer,
+            FlightValuesSerializer,
+        )
+
+    def test_ticket(self):
+        self.assert_same_output(
+            Ticket.objects.select_related(
+                "flight__route__source",
+                "flight__route__destination",
+                "flight__airplane",
+            ),
+            TicketListSerializer,
+            TicketValuesSerializer,
+        )
+
+    def test_order(self):
+        self.assert_same_output(
+            Order.objects.prefetch_related("tickets"),
+            OrderListSerializer,
+            OrderValuesSerializer,
+        )
+
+    def test_list_endpoints_match_model_serializers(self):
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        cases = (
+            (
+                "airport:flight-list",
+                Flight.objects.order_by("departure_time", "id"),
+                FlightListSerializer,
+            ),
+            (
+                "airport:order-list",
+                Order.objects.order_by("-created_at", "id"),
+                OrderListSerializer,
+            ),
+            ("airport:route-list", Route.objects.order_by("id"), RouteListSerializer),
+            ("airport:city-list", City.objects.order_by("id"), CityListSerializer),
+        )
+        for url, queryset, serializer_class in cases:
+            result = client.get(reverse(url))
+
+            self.assertEqual(
+                result.data["results"], serializer_class(queryset, many=True).data
+            )
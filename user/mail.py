@@ -0,0 +1,151 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from user.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, to, from_email=None) -> OutgoingEmail:
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or "",
+    )
+
+
+def claim_batch(batch_size, to=None) -> list:
+    """Take up to batch_size due emails away from other flushers.
+
+    The claimed rows get a lease: their next attempt is pushed past
+    EMAIL_CLAIM_TIMEOUT, so a flusher that dies mid-batch only delays them.
+    With ``to`` only the emails to that address are claimed.
+    """
+    now = timezone.now()
+    emails = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.Status.PENDING, next_attempt_at__lte=now
+    )
+    if to is not None:
+        emails = emails.filter(to=to)
+    with transaction.atomic():
+        emails = list(
+            emails.select_for_update(skip_locked=True).order_by(
+                "next_attempt_at", "id"
+            )[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+        )
+    return emails
+
+
+def retry_delay(attempts) -> timedelta:
+    return timedelta(seconds=settings.EMAIL_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def reconnect(connection) -> None:
+    connection.close()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning("Could not reopen the mail connection: %s", error)
+
+
+def send_batch(connection, emails) -> int:
+    """Send the emails one by one over the open connection.
+
+    A failing message is rescheduled with exponential backoff (or marked
+    failed after EMAIL_MAX_ATTEMPTS) without affecting the rest of the
+    batch. Returns the number of sent emails.
+    """
+    sent = 0
+    for email in emails:
+        message = EmailMessage(
+            email.subject, email.body, email.from_email or None, [email.to]
+        )
+        email.attempts += 1
+        try:
+            connection.send_messages([message])
+        except Exception as error:
+            # The connection may be broken. send_messages would only open a
+            # fresh one for each message, so reopen it for the rest here
+            reconnect(connection)
+            email.last_error = f"{error.__class__.__name__}: {error}"
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = OutgoingEmail.Status.FAILED
+                # Failed emails are never due again, the time they were
+                # given up on is what purge_old_emails keeps them by
+                email.next_attempt_at = timezone.now()
+                logger.error("Giving up on email %s: %s", email.id, email.last_error)
+            else:
+                email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        else:
+            email.status = OutgoingEmail.Status.SENT
+            email.sent_at = timezone.now()
+            email.last_error = ""
+            sent += 1
+    OutgoingEmail.objects.bulk_update(
+        emails,
+        ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+    )
+    return sent
+
+
+def flush_outbox(batch_size=None, max_batches=None, to=None) -> dict:
+    """Send due emails in batches over a single mail connection"""
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_MAX_BATCHES_PER_FLUSH
+    report = {"sent": 0, "errors": 0}
+    connection = None
+    try:
+        for _ in range(max_batches):
+            emails = claim_batch(batch_size, to)
+            if not emails:
+                break
+            if connection is None:
+                connection = get_connection(fail_silently=False)
+                connection.open()
+            sent = send_batch(connection, emails)
+            report["sent"] += sent
+            report["errors"] += len(emails) - sent
+    finally:
+        if connection is not None:
+            connection.close()
+    return report
+
+
+def purge_old_emails(batch_size=None, max_batches=None) -> int:
+    """Delete emails sent or given up on over EMAIL_SENT_RETENTION_DAYS ago.
+
+    Emails are deleted in batches, sent ones first, and the count of
+    deleted emails is returned. That is at most batch_size * max_batches
+    per call so a large backlog is worked off over several runs.
+    """
+    batch_size = batch_size or settings.EMAIL_PURGE_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_PURGE_MAX_BATCHES
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_SENT_RETENTION_DAYS)
+    old_emails = (
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.Status.SENT, sent_at__lt=cutoff
+        ).order_by("sent_at"),
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.Status.FAILED, next_attempt_at__lt=cutoff
+        ).order_by("next_attempt_at"),
+    )
+    deleted = batches = 0
+    for emails in old_emails:
+        while batches < max_batches:
+            ids = list(emails.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            batches += 1
+            deleted += OutgoingEmail.objects.filter(id__in=ids).delete()[0]
+            if len(ids) < batch_size:
+                break
+    return deleted
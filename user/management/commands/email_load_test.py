@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.mail import flush_outbox
+from user.models import OutgoingEmail
+
+# The test emails share the outbox with real mail, the reserved .invalid
+# domain makes sure none of them could ever be delivered
+LOAD_TEST_EMAIL = "email-load-test@sky-journey.invalid"
+
+
+class Command(BaseCommand):
+    """Django command to measure the throughput of the email outbox"""
+
+    help = (
+        "Queue test emails and send them through the outbox with the "
+        "configured EMAIL_BACKEND. Point it at the console backend or the "
+        "mailhog stand-in, never at the real relay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the sent test emails instead of deleting them afterwards",
+        )
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"Backend: {settings.EMAIL_BACKEND}")
+        OutgoingEmail.objects.bulk_create(
+            OutgoingEmail(
+                subject=f"Load test {i}",
+                body="Email outbox load test",
+                to=LOAD_TEST_EMAIL,
+            )
+            for i in range(options["messages"])
+        )
+
+        started = time.perf_counter()
+        report = {"sent": 0, "errors": 0}
+        while True:
+            # Only the test emails, real queued mail stays in the outbox
+            result = flush_outbox(batch_size=options["batch_size"], to=LOAD_TEST_EMAIL)
+            report["sent"] += result["sent"]
+            report["errors"] += result["errors"]
+            if not result["sent"] and not result["errors"]:
+                break
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Sent {report['sent']} email(s) with {report['errors']} error(s) "
+            f"in {elapsed:.2f}s"
+        )
+        if report["sent"] and elapsed > 0:
+            self.stdout.write(f"Throughput: {report['sent'] / elapsed:.1f} emails/s")
+        if not options["keep"]:
+            OutgoingEmail.objects.filter(to=LOAD_TEST_EMAIL).delete()
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-16 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0004_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="emailconfirmationtoken",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-17 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0005_emailconfirmationtoken_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="outgoingemail",
+            index=models.Index(
+                fields=["status", "sent_at"], name="outgoing_email_sent_idx"
+            ),
+        ),
+    ]
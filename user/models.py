@@ -1,8 +1,11 @@
+from datetime import timedelta
 from uuid import uuid4
 
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 
@@ -51,7 +54,53 @@ class User(AbstractUser):
     objects = UserManager()
 
 
+def token_cutoff():
+    """Tokens created before this moment have expired"""
+    return timezone.now() - timedelta(hours=settings.EMAIL_TOKEN_TTL_HOURS)
+
+
 class EmailConfirmationToken(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    @property
+    def is_expired(self) -> bool:
+        return self.created_at < token_cutoff()
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox, sent in batches by flush_email_outbox"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.EmailField()
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outgoing_email_due_idx",
+            ),
+            models.Index(
+                fields=["status", "sent_at"],
+                name="outgoing_email_sent_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} to {self.to} ({self.status})"
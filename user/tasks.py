@@ -1,12 +1,29 @@
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+
+from user.mail import flush_outbox, purge_old_emails, queue_email
+from user.tokens import delete_expired_tokens
 
 
 @shared_task
 def send_email(email, token_id, user_id):
+    """Put the verification email into the outbox, flush_email_outbox sends it"""
     subject = "Account Verification"
     activation_link = f"{settings.ACTIVATION_LINK}{token_id}&user_id={user_id}"
     message = f"Click the link below to verify your email address:\n\n{activation_link}"
-    from_email = settings.DEFAULT_FROM_EMAIL
-    send_mail(subject, message, from_email=from_email, recipient_list=[email])
+    queue_email(subject, message, email)
+
+
+@shared_task(ignore_result=True)
+def flush_email_outbox():
+    return flush_outbox()
+
+
+@shared_task(ignore_result=True)
+def purge_sent_outbox_emails():
+    return purge_old_emails()
+
+
+@shared_task(ignore_result=True)
+def delete_expired_confirmation_tokens():
+    return delete_expired_tokens()
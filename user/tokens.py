@@ -0,0 +1,39 @@
+from django.conf import settings
+
+from user.models import EmailConfirmationToken, token_cutoff
+
+
+def cap_outstanding_tokens(user) -> None:
+    """Delete the oldest tokens so that a new one keeps the user within the cap"""
+    keep = settings.EMAIL_TOKENS_PER_USER - 1
+    stale = list(
+        EmailConfirmationToken.objects.filter(user=user)
+        .order_by("-created_at")
+        .values_list("id", flat=True)[keep:]
+    )
+    if stale:
+        EmailConfirmationToken.objects.filter(id__in=stale).delete()
+
+
+def delete_expired_tokens(batch_size=None, max_batches=None) -> int:
+    """Delete expired tokens in batches, each a short statement of its own.
+
+    Returns the number of deleted tokens, at most batch_size * max_batches
+    per call so a large backlog is worked off over several runs.
+    """
+    batch_size = batch_size or settings.EMAIL_TOKEN_CLEANUP_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_TOKEN_CLEANUP_MAX_BATCHES
+    cutoff = token_cutoff()
+    deleted = 0
+    for _ in range(max_batches):
+        ids = list(
+            EmailConfirmationToken.objects.filter(created_at__lt=cutoff)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted += EmailConfirmationToken.objects.filter(id__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            break
+    return deleted
@@ -1,11 +1,16 @@
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
 from rest_framework import generics, status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from user.authentication import invalidate_cached_user
 from user.models import EmailConfirmationToken
 from user.serializers import UserSerializer, UserListSerializer
 from user.tasks import send_email
+from user.tokens import cap_outstanding_tokens
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -14,6 +19,7 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserListSerializer
+    # Edits the user, so it is loaded in full instead of from the cache
     authentication_classes = (JWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
@@ -26,22 +32,36 @@ class SendEmailConfirmationAPIView(viewsets.ViewSet):
 
     def post(self, request, format=None):
         user = request.user
+        if user.is_email_confirmed:
+            return Response(
+                {"message": "This email has already been verified"},
+                status.HTTP_200_OK,
+            )
+        cap_outstanding_tokens(user)
         token = EmailConfirmationToken.objects.create(user=user)
         send_email.delay(user.email, token.id, user.id)
         return Response({"message": "Email was sent"}, status.HTTP_201_CREATED)
 
     def email_verification(self, request):
-        token_id = request.GET.get("token_id")
         try:
-            token = EmailConfirmationToken.objects.get(id=token_id)
-            user = token.user
-            if user.is_email_confirmed:
-                return Response(
-                    {"message": "This email has already been verified"},
-                    status.HTTP_200_OK,
-                )
-            user.is_email_confirmed = True
-            user.save()
-            return Response({"message": "Email confirmed"}, status.HTTP_200_OK)
-        except EmailConfirmationToken.DoesNotExist:
+            token_id = UUID(request.GET.get("token_id", ""))
+        except ValueError:
+            return Response({"message": "Not Confirm"}, status.HTTP_400_BAD_REQUEST)
+        token = (
+            EmailConfirmationToken.objects.select_related("user")
+            .filter(id=token_id)
+            .first()
+        )
+        if token is None or token.is_expired:
             return Response({"message": "Not Confirm"}, status.HTTP_400_BAD_REQUEST)
+        if token.user.is_email_confirmed:
+            return Response(
+                {"message": "This email has already been verified"},
+                status.HTTP_200_OK,
+            )
+        get_user_model().objects.filter(id=token.user_id).update(
+            is_email_confirmed=True
+        )
+        # update() skips the post_save receiver that drops the cached user
+        invalidate_cached_user(token.user_id)
+        return Response({"message": "Email confirmed"}, status.HTTP_200_OK)